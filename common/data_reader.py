@@ -1,32 +1,274 @@
-from typing import List
+import bz2
+import glob
+import gzip
+import heapq
+import lzma
+import os
+import re
+from datetime import date, datetime
+from itertools import chain, compress
+from operator import itemgetter
+from typing import IO, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from common.timestamps import TimestampReconstructor, seconds_of_day
 from logs.log_config import setup_logging
 
+DEFAULT_BLOCK_SIZE = 4 * 1024 * 1024  # 4MB of whole lines per block
+BATCH_LINES = 100000
+
+# Leading magic bytes of the archive formats captures are stored in
+COMPRESSION_MAGIC = {
+    b'\x1f\x8b': 'gzip',
+    b'\xfd7zXZ\x00': 'xz',
+    b'BZh': 'bz2'
+}
+COMPRESSION_OPENERS = {
+    'gzip': gzip.open,
+    'xz': lzma.open,
+    'bz2': bz2.open
+}
+
+def detect_compression(path: str) -> Optional[str]:
+    """Return 'gzip', 'xz' or 'bz2' based on the file's magic bytes, or None for plain text."""
+    with open(path, 'rb') as f:
+        header = f.read(6)
+    for magic, compression in COMPRESSION_MAGIC.items():
+        if header.startswith(magic):
+            return compression
+    return None
+
+def open_text(path: str) -> IO[str]:
+    """Open a capture for reading as text, decompressing it as a stream if needed."""
+    compression = detect_compression(path)
+    if compression:
+        return COMPRESSION_OPENERS[compression](path, 'rt')
+    return open(path, 'r')
+
+def batch_lines(lines: Iterable[str], batch_size: int = BATCH_LINES) -> Iterator[str]:
+    """Join lines into text blocks of up to `batch_size` lines, for the block parsers."""
+    batch: List[str] = []
+    for line in lines:
+        batch.append(line.rstrip('\n'))
+        if len(batch) >= batch_size:
+            yield '\n'.join(batch)
+            batch = []
+    if batch:
+        yield '\n'.join(batch)
+
+def match_lines(pattern: re.Pattern, text: str) -> Tuple[int, List[tuple]]:
+    """Line count of a block and one findall match per line, for a MULTILINE pattern matching every line once."""
+    line_count = text.count('\n') + (0 if not text or text.endswith('\n') else 1)
+    # A block ending in a newline yields one extra empty match after it
+    return line_count, pattern.findall(text)[:line_count]
+
+def unmatched_lines(matches: List[tuple], group: int) -> List[int]:
+    """Indices of the non-blank lines captured whole by the catch-all `group` of match_lines' pattern."""
+    return [i for i in compress(range(len(matches)), map(itemgetter(group), matches)) if matches[i][group].strip()]
+
+SECONDS_PER_DAY = 24 * 3600
+CLOCK_PATTERN = re.compile(r'^\s*\[(\d{1,2}):(\d{2}):(\d{2})\]')
+CLOCK_TIMES_PATTERN = re.compile(r'^[ \t]*\[(\d{1,2}:\d{2}:\d{2})\]', re.MULTILINE)
+
+PathSpec = Union[str, Sequence[str]]
+
+def expand_paths(spec: PathSpec) -> List[str]:
+    """Expand a path, directory or glob (or a list of them) into a sorted list of files."""
+    specs = [spec] if isinstance(spec, str) else list(spec)
+    paths = []
+    for item in specs:
+        if os.path.isdir(item):
+            paths.extend(sorted(
+                os.path.join(item, name) for name in os.listdir(item)
+                if os.path.isfile(os.path.join(item, name))
+            ))
+        elif glob.has_magic(item):
+            paths.extend(sorted(glob.glob(item)))
+        else:
+            paths.append(item)
+    return paths
+
+def _clock_seconds(line: str) -> Optional[int]:
+    match = CLOCK_PATTERN.match(line)
+    if not match:
+        return None
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+
+class _TimedFile:
+    """A capture file in a time-ordered merge, keyed by (calendar day, seconds of day).
+
+    Captures only record HH:MM:SS, so days are anchored to the file's
+    modification time: the last sample was taken on the day of the last
+    write, or the day before if it is later in the day than that write, and
+    the file starts as many days earlier as it crosses midnight. Within the
+    file the day advances whenever the clock goes backwards by more than 12 hours.
+    """
+
+    def __init__(self, path: str, index: int):
+        self.path = path
+        self.index = index
+        self.first_seconds = None
+        # Only the rollover count and last time of day are used, so the clock's own date does not matter
+        clock = TimestampReconstructor('1970-01-01')
+        with open_text(path) as f:
+            while True:
+                block = f.read(DEFAULT_BLOCK_SIZE)
+                if not block:
+                    break
+                if not block.endswith('\n'):
+                    block += f.readline()
+                seconds = seconds_of_day(CLOCK_TIMES_PATTERN.findall(block))
+                seconds = seconds[seconds >= 0]
+                if len(seconds):
+                    if self.first_seconds is None:
+                        self.first_seconds = int(seconds[0])
+                    clock.convert(seconds)
+
+        modified = datetime.fromtimestamp(os.path.getmtime(path))
+        modified_seconds = modified.hour * 3600 + modified.minute * 60 + modified.second
+        end_day = modified.toordinal()
+        if clock.last_seconds is not None and clock.last_seconds > modified_seconds:
+            end_day -= 1
+        self.start_day = end_day - clock.day_offset
+
+    @property
+    def start_key(self) -> int:
+        return self.start_day * SECONDS_PER_DAY + (self.first_seconds or 0)
+
+    def timed_lines(self) -> Iterator[Tuple[int, str]]:
+        """Yield (sort key, line); lines without a timestamp keep the previous key."""
+        key = self.start_key
+        day = self.start_day
+        last_seconds = self.first_seconds
+        with open_text(self.path) as f:
+            for line in f:
+                if not line.endswith('\n'):
+                    line += '\n'
+                seconds = _clock_seconds(line)
+                if seconds is not None:
+                    if last_seconds is not None and last_seconds - seconds > SECONDS_PER_DAY // 2:
+                        day += 1
+                    last_seconds = seconds
+                    key = day * SECONDS_PER_DAY + seconds
+                yield key, line
+
+def merge_by_time(paths: Sequence[str]) -> Iterator[str]:
+    """K-way heap merge of capture files into one stream ordered by timestamp.
+
+    Every file is scanned once up front to date it. Files are then opened
+    lazily: a file only joins the heap once the merge has reached its first
+    timestamp, so rotated captures that do not overlap keep just one or two
+    files open at a time.
+    """
+    files = [_TimedFile(path, index) for index, path in enumerate(paths)]
+    pending = sorted((f for f in files if f.first_seconds is not None), key=lambda f: (f.start_key, f.index))
+    pending.reverse()
+    heap = []
+
+    while pending or heap:
+        while pending and (not heap or pending[-1].start_key <= heap[0][0]):
+            timed_file = pending.pop()
+            lines = timed_file.timed_lines()
+            first = next(lines, None)
+            if first:
+                heapq.heappush(heap, (first[0], timed_file.index, first[1], lines))
+
+        key, index, line, lines = heapq.heappop(heap)
+        yield line
+        following = next(lines, None)
+        if following:
+            heapq.heappush(heap, (following[0], index, following[1], lines))
+
+def capture_start_date(paths: Sequence[str]) -> str:
+    """The day (YYYY-MM-DD) the earliest of `paths` starts on, anchored to file modification times.
+
+    Unlike today's date it stays the same from run to run, so timestamps
+    and everything keyed on them (parse and forecast caches) are stable.
+    Falls back to today when no file can be read.
+    """
+    days = []
+    for path in paths:
+        try:
+            timed_file = _TimedFile(path, 0)
+        except OSError:
+            continue
+        if timed_file.first_seconds is not None:
+            days.append(timed_file.start_day)
+    return date.fromordinal(min(days)).isoformat() if days else datetime.now().strftime('%Y-%m-%d')
+
 class DataReader:
-    def __init__(self, perf_file: str, health_file: str):
+    def __init__(self, perf_file: PathSpec, health_file: PathSpec):
+        """Both arguments accept a file, a directory, a glob or a list of them."""
         self.perf_file = perf_file
         self.health_file = health_file
-        self.logger = setup_logging()
-    
-    def read_performance_data(self) -> List[str]:
+        self.perf_paths = expand_paths(perf_file)
+        self.health_paths = expand_paths(health_file)
+        self.logger = setup_logging(name=__name__)
+
+    def _iter_lines(self, path: str, label: str) -> Iterator[str]:
+        """Lazily yield lines from a file so only one line is held in memory."""
         try:
-            with open(self.perf_file, 'r') as f:
-                self.logger.info(f"Reading performance data from {self.perf_file}")
-                return f.readlines()
+            with open_text(path) as f:
+                self.logger.info("Reading %s data from %s", label, path)
+                yield from f
         except FileNotFoundError:
-            self.logger.error(f"Performance file not found: {self.perf_file}")
-            return []
+            self.logger.error("%s file not found: %s", label.capitalize(), path)
         except Exception as e:
-            self.logger.error(f"Error reading performance file: {e}")
-            return []
-    
-    def read_health_data(self) -> List[str]:
+            self.logger.error("Error reading %s file: %s", label, e)
+
+    def _iter_blocks(self, path: str, label: str, block_size: int) -> Iterator[str]:
+        """Lazily yield text blocks of roughly block_size bytes that end on a line boundary."""
         try:
-            with open(self.health_file, 'r') as f:
-                self.logger.info(f"Reading health data from {self.health_file}")
-                return f.readlines()
+            with open_text(path) as f:
+                self.logger.info("Reading %s data from %s in %s byte blocks", label, path, block_size)
+                while True:
+                    block = f.read(block_size)
+                    if not block:
+                        break
+                    if not block.endswith('\n'):
+                        block += f.readline()
+                    yield block
         except FileNotFoundError:
-            self.logger.error(f"Health file not found: {self.health_file}")
-            return []
+            self.logger.error("%s file not found: %s", label.capitalize(), path)
         except Exception as e:
-            self.logger.error(f"Error reading health file: {e}")
-            return []
+            self.logger.error("Error reading %s file: %s", label, e)
+
+    def _iter_merged(self, paths: List[str]) -> Iterator[str]:
+        try:
+            self.logger.info("Merging performance data from %s files", len(paths))
+            yield from merge_by_time(paths)
+        except FileNotFoundError as e:
+            self.logger.error("Performance file not found: %s", e.filename)
+        except Exception as e:
+            self.logger.error("Error merging performance files: %s", e)
+
+    def _merged_blocks(self, paths: List[str], block_size: int) -> Iterator[str]:
+        block = []
+        block_bytes = 0
+        for line in self._iter_merged(paths):
+            block.append(line)
+            block_bytes += len(line)
+            if block_bytes >= block_size:
+                yield ''.join(block)
+                block = []
+                block_bytes = 0
+        if block:
+            yield ''.join(block)
+
+    def read_performance_data(self) -> Iterator[str]:
+        if len(self.perf_paths) > 1:
+            return self._iter_merged(self.perf_paths)
+        return chain.from_iterable(self._iter_lines(path, 'performance') for path in self.perf_paths)
+
+    def read_health_data(self) -> Iterator[str]:
+        return chain.from_iterable(self._iter_lines(path, 'health') for path in self.health_paths)
+
+    def read_performance_blocks(self, block_size: int = DEFAULT_BLOCK_SIZE) -> Iterator[str]:
+        if len(self.perf_paths) > 1:
+            return self._merged_blocks(self.perf_paths, block_size)
+        return chain.from_iterable(self._iter_blocks(path, 'performance', block_size) for path in self.perf_paths)
+
+    def read_health_blocks(self, block_size: int = DEFAULT_BLOCK_SIZE,
+                           paths: Optional[Sequence[str]] = None) -> Iterator[str]:
+        """Blocks of all restarts files in turn, or only of `paths` if given."""
+        paths = self.health_paths if paths is None else paths
+        return chain.from_iterable(self._iter_blocks(path, 'health', block_size) for path in paths)
@@ -0,0 +1,84 @@
+import re
+from functools import lru_cache
+from typing import Iterable, Union
+import numpy as np
+import pandas as pd
+
+# Multipliers of the Kubernetes quantity suffixes, relative to the base unit (cores, bytes)
+BINARY_SUFFIXES = {
+    'Ki': 2**10,
+    'Mi': 2**20,
+    'Gi': 2**30,
+    'Ti': 2**40,
+    'Pi': 2**50,
+    'Ei': 2**60
+}
+DECIMAL_SUFFIXES = {
+    'n': 1e-9,
+    'u': 1e-6,
+    'm': 1e-3,
+    '': 1,
+    'k': 1e3,
+    'M': 1e6,
+    'G': 1e9,
+    'T': 1e12,
+    'P': 1e15,
+    'E': 1e18
+}
+SUFFIXES = {**DECIMAL_SUFFIXES, **BINARY_SUFFIXES}
+
+# <signed number><binary suffix | decimal exponent | decimal suffix>; "1E" is exa, "1E3" an exponent
+_QUANTITY_PATTERN = re.compile(
+    r'^([+-]?(?:\d+\.?\d*|\.\d+))(?:([eE][+-]?\d+)|(Ki|Mi|Gi|Ti|Pi|Ei|[numkMGTPE]))?$'
+)
+
+@lru_cache(maxsize=65536)
+def parse_quantity(value: str, scale: float = 1.0) -> float:
+    """Convert a Kubernetes quantity (e.g. '393m', '1.5Gi', '2e3', '100M') to its base unit times `scale`.
+
+    Invalid quantities are NaN. The suffix and `scale` are combined before
+    multiplying, so e.g. '393m' in millicores is exactly 393.0.
+    """
+    match = _QUANTITY_PATTERN.match(value.strip())
+    if not match:
+        return float('nan')
+    number, exponent, suffix = match.groups()
+    if exponent:
+        return float(number + exponent) * scale
+    return float(number) * (SUFFIXES[suffix or ''] * scale)
+
+def parse_quantities(values: Union[pd.Series, np.ndarray, Iterable], scale: float = 1.0) -> np.ndarray:
+    """Vectorized parse_quantity, times `scale`, as a float64 array.
+
+    The values are dictionary-encoded first, so each distinct string is
+    parsed once however often it repeats. Numbers pass through unchanged
+    (they are taken to be in the scaled unit already); missing or invalid
+    values become NaN.
+    """
+    values = pd.Series(values) if not isinstance(values, pd.Series) else values
+    if pd.api.types.is_numeric_dtype(values.dtype):
+        return values.to_numpy(dtype=np.float64, na_value=np.nan)
+    codes, uniques = pd.factorize(values)
+    parsed = np.array([
+        float(value) if isinstance(value, (int, float)) else
+        parse_quantity(value, scale) if isinstance(value, str) else float('nan')
+        for value in uniques
+    ], dtype=np.float64)
+    # factorize gives missing values the code -1, which picks the NaN appended here
+    return np.append(parsed, np.nan)[codes]
+
+def parse_cpu_millicores(value: str) -> float:
+    """Convert a Kubernetes CPU quantity (e.g. '393m', '2') to millicores."""
+    return parse_quantity(value, 1000)
+
+def parse_memory_bytes(value: str) -> float:
+    """Convert a Kubernetes memory quantity (e.g. '512Mi') to bytes."""
+    return parse_quantity(value)
+
+def cpu_millicores(values) -> np.ndarray:
+    """Vectorized parse_cpu_millicores."""
+    return parse_quantities(values, 1000)
+
+def memory_bytes(values) -> np.ndarray:
+    """Vectorized parse_memory_bytes."""
+    return parse_quantities(values)
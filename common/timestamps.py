@@ -0,0 +1,68 @@
+from functools import lru_cache
+from typing import Any, Dict, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+SECONDS_PER_DAY = 24 * 3600
+NS_PER_SECOND = 1000000000
+# A jump backwards larger than this is treated as crossing midnight rather
+# than as jitter between samples taken in the same second.
+ROLLOVER_THRESHOLD = SECONDS_PER_DAY // 2
+
+@lru_cache(maxsize=131072)
+def _clock_seconds(value: str) -> int:
+    """Convert 'HH:MM:SS' to seconds since midnight, or -1 if it is not a valid clock time."""
+    parts = value.split(':')
+    if len(parts) != 3 or not all(part.isdigit() for part in parts):
+        return -1
+    hours, minutes, seconds = (int(part) for part in parts)
+    if hours > 23 or minutes > 59 or seconds > 59:
+        return -1
+    return hours * 3600 + minutes * 60 + seconds
+
+def seconds_of_day(times: Sequence[str]) -> np.ndarray:
+    """Convert an array of 'HH:MM:SS' strings to int64 seconds since midnight.
+
+    Capture times repeat heavily, so only the distinct strings are parsed.
+    Unparsable values are returned as -1.
+    """
+    codes, distinct = pd.factorize(np.asarray(times, dtype=object))
+    parsed = np.fromiter((_clock_seconds(value) for value in distinct), dtype=np.int64, count=len(distinct))
+    return parsed[codes]
+
+class TimestampReconstructor:
+    """Turn wall-clock times of day into monotonic epoch timestamps.
+
+    The capture only records HH:MM:SS, so the calendar day is reconstructed:
+    it starts at ``date`` and advances every time the clock goes backwards by
+    more than ROLLOVER_THRESHOLD. State carries over between calls, so a file
+    can be converted block by block and resumed from a checkpoint.
+    """
+
+    def __init__(self, date: str, day_offset: int = 0, last_seconds: Optional[int] = None):
+        self.date = date
+        self.base_ns = pd.Timestamp(date).value
+        self.day_offset = day_offset
+        self.last_seconds = last_seconds
+
+    def convert(self, seconds: np.ndarray) -> np.ndarray:
+        """Convert valid seconds-of-day to int64 epoch nanoseconds in one vectorized pass."""
+        seconds = np.asarray(seconds, dtype=np.int64)
+        if not len(seconds):
+            return np.empty(0, dtype=np.int64)
+
+        previous = np.empty_like(seconds)
+        previous[0] = seconds[0] if self.last_seconds is None else self.last_seconds
+        previous[1:] = seconds[:-1]
+        days = self.day_offset + np.cumsum(previous - seconds > ROLLOVER_THRESHOLD)
+
+        self.day_offset = int(days[-1])
+        self.last_seconds = int(seconds[-1])
+        return self.base_ns + (days * SECONDS_PER_DAY + seconds) * NS_PER_SECOND
+
+    def state(self) -> Dict[str, Any]:
+        return {'date': self.date, 'day_offset': self.day_offset, 'last_seconds': self.last_seconds}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> 'TimestampReconstructor':
+        return cls(state['date'], state['day_offset'], state['last_seconds'])
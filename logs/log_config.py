@@ -1,23 +1,115 @@
+import atexit
+from collections import Counter
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+import multiprocessing
 import os
+import threading
+from typing import Optional, Tuple
 
-def setup_logging(log_level: str = "INFO"):
-    """Configure logging with rotating file handler."""
-    log_dir = os.path.join(os.path.dirname(__file__), 'logs')
-    os.makedirs(log_dir, exist_ok=True)
-    
-    logging.basicConfig(
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        level=getattr(logging, log_level),
-        handlers=[
-            RotatingFileHandler(
-                os.path.join(log_dir, 'performance_test.log'),
-                maxBytes=10485760,  # 10MB
-                backupCount=5
-            )
-        ]
-    )
-    
-    logger = logging.getLogger(__name__)
-    return logger
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_listener: Optional[QueueListener] = None
+_queue: Optional[multiprocessing.Queue] = None
+_configured = False
+_lock = threading.Lock()
+
+def setup_logging(log_level: str = "INFO", name: str = __name__) -> logging.Logger:
+    """Configure logging once and return the logger called `name`.
+
+    Records are put on a queue by the logging thread and written to a
+    rotating file by a background QueueListener, so file I/O never runs on
+    the caller's path. The queue is a multiprocessing one so pool workers
+    started with init_worker_logging() log through the same listener.
+    Later calls only look up the logger; if the application already
+    configured the root logger it is left alone.
+    """
+    global _listener, _queue, _configured
+    with _lock:
+        if not _configured:
+            _configured = True
+            root = logging.getLogger()
+            if not root.handlers:
+                log_dir = os.path.join(os.path.dirname(__file__), 'logs')
+                os.makedirs(log_dir, exist_ok=True)
+                file_handler = RotatingFileHandler(
+                    os.path.join(log_dir, 'performance_test.log'),
+                    maxBytes=10485760,  # 10MB
+                    backupCount=5
+                )
+                file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+                _queue = multiprocessing.Queue()
+                root.addHandler(QueueHandler(_queue))
+                root.setLevel(getattr(logging, log_level))
+                _listener = QueueListener(_queue, file_handler)
+                _listener.start()
+                atexit.register(shutdown_logging)
+
+    return logging.getLogger(name)
+
+def shutdown_logging():
+    """Write out queued records and stop the background writer."""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
+
+def worker_logging_args() -> Tuple[Optional[multiprocessing.Queue], int]:
+    """The initargs of init_worker_logging() for a process pool started by this process."""
+    return _queue, logging.getLogger().level
+
+def init_worker_logging(log_queue: Optional[multiprocessing.Queue], level: int):
+    """Process pool initializer: send the worker's records to the parent's listener.
+
+    Workers never run a listener of their own, so records they queue locally
+    would be lost. Without a parent queue (the application configured logging
+    itself) the worker keeps the handlers it started with.
+    """
+    global _listener, _configured
+    with _lock:
+        _configured = True
+        # The parent's listener thread is not running here and must not be stopped from here
+        _listener = None
+        if log_queue is not None:
+            root = logging.getLogger()
+            for handler in root.handlers[:]:
+                root.removeHandler(handler)
+            root.addHandler(QueueHandler(log_queue))
+            root.setLevel(level)
+
+class LogSampler:
+    """Rate limiter for log messages that can fire once per input record.
+
+    Every call is counted per key, but only the first `first` occurrences
+    and then one in every `every` reach the logger. summary() logs the
+    totals once the work is done.
+    """
+
+    def __init__(self, logger: logging.Logger, first: int = 5, every: int = 1000):
+        self.logger = logger
+        self.first = first
+        self.every = every
+        self.counts: Counter = Counter()
+
+    def log(self, key: str, level: int, msg: str, *args, **kwargs):
+        self.counts[key] += 1
+        count = self.counts[key]
+        if (count <= self.first or count % self.every == 0) and self.logger.isEnabledFor(level):
+            self.logger.log(level, msg, *args, **kwargs)
+
+    def warning(self, key: str, msg: str, *args, **kwargs):
+        self.log(key, logging.WARNING, msg, *args, **kwargs)
+
+    def error(self, key: str, msg: str, *args, **kwargs):
+        self.log(key, logging.ERROR, msg, *args, **kwargs)
+
+    def summary(self, level: int = logging.WARNING):
+        """Log how often each key occurred and reset the counters."""
+        for key, count in sorted(self.counts.items()):
+            logged = min(count, self.first) + max(0, count // self.every - self.first // self.every)
+            self.logger.log(level, "%s: %d occurrences, %d logged", key, count, logged)
+        self.counts.clear()
@@ -1,4 +1,5 @@
 from .models import PodMetrics, PodHealth
+from .metrics_store import GroupIndex, MetricsStore
 from .kubernetes_monitor import KubernetesMonitor
 from .metrics_visualizer import MetricsVisualizer
 from .metrics_processor import MetricsProcessor
@@ -8,6 +9,8 @@ from logs.log_config import setup_logging
 __all__ = [
     'PodMetrics',
     'PodHealth',
+    'MetricsStore',
+    'GroupIndex',
     'KubernetesMonitor',
     'MetricsVisualizer',
     'MetricsProcessor',
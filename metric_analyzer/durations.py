@@ -0,0 +1,41 @@
+import re
+from functools import lru_cache
+from typing import Sequence
+import numpy as np
+import pandas as pd
+
+# Units used by kubectl's human-readable durations, e.g. "2y", "3d4h", "5m30s"
+DURATION_UNITS = {
+    'y': 365 * 24 * 3600,
+    'd': 24 * 3600,
+    'h': 3600,
+    'm': 60,
+    's': 1
+}
+DURATION_PATTERN = re.compile(r'^\(?\s*((?:\d+(?:\.\d+)?[ydhms])+)(?:\s+ago)?\s*\)?$')
+DURATION_PART_PATTERN = re.compile(r'(\d+(?:\.\d+)?)([ydhms])')
+
+@lru_cache(maxsize=16384)
+def duration_seconds(value: str) -> float:
+    """Convert a kubectl duration such as "3d4h", "2y" or "(25m3s ago)" to seconds.
+
+    Returns NaN for values that are not durations, e.g. "<invalid>".
+    """
+    match = DURATION_PATTERN.match(value.strip())
+    if not match:
+        return float('nan')
+    return float(sum(
+        float(amount) * DURATION_UNITS[unit]
+        for amount, unit in DURATION_PART_PATTERN.findall(match.group(1))
+    ))
+
+def durations_seconds(values: Sequence[str]) -> np.ndarray:
+    """Convert a column of kubectl durations to float seconds.
+
+    Pod listings repeat a small set of duration strings, so each distinct
+    string is parsed once and the results are mapped back to every row.
+    """
+    codes, distinct = pd.factorize(np.asarray(values, dtype=object))
+    parsed = np.fromiter((duration_seconds(value) for value in distinct), dtype=np.float64, count=len(distinct))
+    # Missing values get code -1, which indexes the trailing NaN
+    return np.append(parsed, np.nan)[codes]
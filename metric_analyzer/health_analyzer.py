@@ -1,24 +1,162 @@
 
-from typing import Set, List
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set
 import re
+import numpy as np
+import pandas as pd
+from common.data_reader import batch_lines, match_lines, unmatched_lines
 from logs.log_config import setup_logging
+from .durations import durations_seconds
+from .models import PodHealth
+from .quarantine import MALFORMED, QuarantineSink, Rejects
+from .workload_resolver import workload_name
+
+# One `kubectl get pods [-A]` row: [NAMESPACE] NAME READY STATUS RESTARTS [(LAST AGO ago)] AGE [wide columns].
+# Every line matches exactly once: header rows match without captures and any
+# other line that is not a pod row is captured whole by the last group.
+HEALTH_LINE_PATTERN = re.compile(
+    r'^[ \t]*(?:(?:(\S+)[ \t]+)??(\S+)[ \t]+(\d+/\d+)[ \t]+(\S+)[ \t]+(\d+)'
+    r'(?:[ \t]+\(([^)\n]*?)[ \t]+ago\))?[ \t]+(\S+)(?:[ \t]+[^\n]*?)?'
+    r'|(?:NAMESPACE[ \t]+)?NAME[ \t][^\n]*|([^\n]*))[ \t]*\r?$',
+    re.MULTILINE
+)
+HEALTH_COLUMNS = ['namespace', 'name', 'ready', 'status', 'restarts', 'last_restart', 'age', 'line']
+TABLE_COLUMNS = ['namespace', 'name', 'ready', 'status', 'restarts', 'last_restart_age', 'age']
+
+class PodHealthTable:
+    """Column-wise table of PodHealth rows parsed from `kubectl get pods` output.
+
+    Restart and pod ages are float seconds; last_restart_age is NaN for pods
+    that never restarted.
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+
+    @classmethod
+    def empty(cls) -> 'PodHealthTable':
+        return cls.from_raw(pd.DataFrame(columns=HEALTH_COLUMNS[:-1], dtype=object))
+
+    @classmethod
+    def from_raw(cls, raw: pd.DataFrame) -> 'PodHealthTable':
+        """Type the string columns extracted by HEALTH_LINE_PATTERN."""
+        return cls(pd.DataFrame({
+            'namespace': raw['namespace'].astype(object),
+            'name': raw['name'].astype(object),
+            'ready': raw['ready'].astype(object),
+            'status': raw['status'].astype('category'),
+            'restarts': raw['restarts'].astype(np.int64),
+            'last_restart_age': durations_seconds(raw['last_restart']),
+            'age': durations_seconds(raw['age'])
+        }))
+
+    @classmethod
+    def concat(cls, tables: List['PodHealthTable']) -> 'PodHealthTable':
+        tables = [t for t in tables if len(t)]
+        if not tables:
+            return cls.empty()
+        frame = pd.concat([t.frame for t in tables], ignore_index=True)
+        frame['status'] = frame['status'].astype('category')
+        return cls(frame)
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> 'PodHealthTable':
+        """Rebuild a table from to_arrays() output."""
+        frame = pd.DataFrame({column: arrays[column] for column in TABLE_COLUMNS})
+        for column in ('namespace', 'name', 'ready'):
+            frame[column] = frame[column].astype(object)
+        frame['status'] = frame['status'].astype(object).astype('category')
+        return cls(frame)
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Plain NumPy columns (strings as fixed-width unicode) suitable for NPZ storage."""
+        arrays = {}
+        for column in TABLE_COLUMNS:
+            values = self.frame[column]
+            arrays[column] = values.to_numpy() if values.dtype.kind in 'if' else values.to_numpy(dtype=str)
+        return arrays
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def services(self) -> np.ndarray:
+        """Workload name of every row, resolving each distinct pod name once."""
+        codes, pods = pd.factorize(self.frame['name'])
+        return np.array([workload_name(pod) for pod in pods], dtype=object)[codes]
+
+    def problematic_mask(self, window_hours: Optional[float] = None) -> np.ndarray:
+        """Rows that restarted or are crash looping, optionally only if the last restart is recent."""
+        mask = ((self.frame['restarts'] > 0) | (self.frame['status'] == 'CrashLoopBackOff')).to_numpy()
+        if window_hours is not None:
+            mask = mask & (self.frame['last_restart_age'] <= window_hours * 3600).to_numpy()
+        return mask
+
+    def problematic_services(self, window_hours: Optional[float] = None) -> Set[str]:
+        mask = self.problematic_mask(window_hours)
+        if not mask.any():
+            return set()
+        pods = pd.unique(self.frame['name'][mask])
+        return {workload_name(pod) for pod in pods}
+
+    def rows(self) -> Iterator[PodHealth]:
+        for row in self.frame.itertuples(index=False):
+            yield PodHealth(
+                name=row.name,
+                restarts=row.restarts,
+                status=row.status,
+                namespace=row.namespace,
+                ready=row.ready,
+                last_restart_age=None if pd.isna(row.last_restart_age) else row.last_restart_age,
+                age=None if pd.isna(row.age) else row.age
+            )
+
+class ParsedHealthBlock(NamedTuple):
+    table: PodHealthTable
+    line_count: int
+    rejects: Rejects
+
+def parse_health_block(text: str) -> ParsedHealthBlock:
+    """Parse a block of `kubectl get pods` rows with one compiled regex pass.
+
+    Lines that are neither pod rows, headers nor blank are returned as
+    rejects with their line numbers in the block.
+    """
+    line_count, matches = match_lines(HEALTH_LINE_PATTERN, text)
+    malformed = unmatched_lines(matches, 7)
+    rejects = Rejects(
+        np.array(malformed, dtype=np.int64) + 1,
+        [MALFORMED] * len(malformed),
+        [matches[i][7].rstrip() for i in malformed]
+    ) if malformed else Rejects.empty()
+
+    rows = [m for m in matches if m[1]]
+    if not rows:
+        return ParsedHealthBlock(PodHealthTable.empty(), line_count, rejects)
+    return ParsedHealthBlock(PodHealthTable.from_raw(pd.DataFrame(rows, columns=HEALTH_COLUMNS)), line_count, rejects)
 
 class HealthAnalyzer:
-    def analyze_pods(self, lines: List[str]) -> Set[str]:
-        problematic_services = set()
-        self.logger = setup_logging()
-        
-        for line in lines:
-            if "NAME" not in line and line.strip():
-                parts = line.strip().split()
-                if len(parts) >= 6:
-                    name = parts[1]
-                    status = parts[3]
-                    restarts = parts[4]
-                    self.logger.info(f"Pod: {name}, Status: {status}, Restarts: {restarts}")
-                    service_name = re.match(r'([\w-]+)-[a-f0-9]', name)
-                    self.logger.debug(f"Processing pod {name} with status {status} and restarts {restarts}")
-                    if service_name and (int(restarts.split()[0]) > 0 or status == "CrashLoopBackOff"):
-                        problematic_services.add(service_name.group(1))
-        
-        return problematic_services
+    def __init__(self, quarantine: Optional[QuarantineSink] = None):
+        self.logger = setup_logging(name=__name__)
+        self.quarantine = quarantine or QuarantineSink()
+
+    def parse_blocks(self, blocks: Iterable[str], source: str = 'health') -> PodHealthTable:
+        tables = []
+        rejected = 0
+        line = 1
+        for block in blocks:
+            parsed = parse_health_block(block)
+            tables.append(parsed.table)
+            self.quarantine.add(source, parsed.rejects, line)
+            rejected += len(parsed.rejects.lines)
+            line += parsed.line_count
+
+        table = PodHealthTable.concat(tables)
+        if rejected:
+            self.logger.warning("Quarantined %d unparsable health lines from %s", rejected, source)
+        self.logger.info("Parsed health of %d pods", len(table))
+        return table
+
+    def parse_lines(self, lines: Iterable[str], source: str = 'health') -> PodHealthTable:
+        return self.parse_blocks(batch_lines(lines), source)
+
+    def analyze_pods(self, lines: Iterable[str]) -> Set[str]:
+        return self.parse_lines(lines).problematic_services()
@@ -1,144 +1,281 @@
-from datetime import datetime
-from typing import List, Set, Dict, Any
-import re
+import hashlib
+import os
+from typing import Iterable, Optional, Set, Dict, Any
 import logging
-import pandas as pd
-from common.data_reader import DataReader
-from metric_analyzer.models import PodMetrics
-from recommender_system.resource_recommender import ResourceRecommenderProphet
+from common.data_reader import DataReader, PathSpec, capture_start_date, detect_compression
+from common.timestamps import TimestampReconstructor
+from recommender_system.forecast_pool import RESOURCES, ForecastPool, ForecastTask
+from recommender_system.percentile_recommender import PercentileRecommender
+from recommender_system.quantile_sketch import SketchHistory, SketchSet
+from .health_analyzer import HealthAnalyzer, PodHealthTable
 from .metrics_visualizer import MetricsVisualizer
 from .metrics_processor import MetricsProcessor
+from .metrics_store import MetricsStore
+from .parse_cache import ParsedDataCache
+from .quarantine import QuarantineSink
+from .resampling import Resampler
+from .restart_history import RestartHistoryStore
+from .workload_resolver import workload_name
 
 class KubernetesMonitor:
     def __init__(self, 
-                 metrics_file: str, 
-                 restarts_file: str):
+                 metrics_file: PathSpec, 
+                 restarts_file: PathSpec,
+                 ingest_workers: int = 1,
+                 cache_dir: Optional[str] = "cache",
+                 follow: bool = False,
+                 pushdown: bool = True,
+                 history_db: Optional[str] = None,
+                 quarantine_file: Optional[str] = None,
+                 forecast_workers: int = 1,
+                 warm_start: bool = False,
+                 forecast_backend: str = 'prophet',
+                 sketch_file: Optional[str] = None,
+                 all_services: bool = False,
+                 resample_bucket: Optional[str] = None,
+                 resample_aggregate: str = 'mean',
+                 per_pod: bool = True):
         self.metrics_file = metrics_file
         self.restarts_file = restarts_file
+        self.ingest_workers = ingest_workers
+        self.follow = follow
+        # Recommending for every service, or recording sketches of every service, needs every metric line,
+        # so either turns pushdown filtering off
+        self.all_services = all_services
+        self.pushdown = pushdown and not all_services and not sketch_file
         self.reader = DataReader(self.metrics_file, self.restarts_file)
-        self.processor = MetricsProcessor(datetime.now().strftime("%Y-%m-%d"))
+        # Metrics caching, follow mode and parallel ingest work on a single file; multi-file inputs are stream-merged
+        self.metrics_path = self.reader.perf_paths[0] if len(self.reader.perf_paths) == 1 else None
+        # Unparsable lines of both inputs are counted in one sink and optionally written to `quarantine_file`
+        self.quarantine = QuarantineSink(quarantine_file)
+        # Captures only record times of day; their date comes from the files, so reruns give the same timestamps
+        # Sketches are built block by block while parsing when percentiles or a sketch history need them
+        sketching = forecast_backend == 'percentile' or bool(sketch_file)
+        self.processor = MetricsProcessor(capture_start_date(self.reader.perf_paths), self.quarantine,
+                                          workload_name if sketching else None)
+        self.health_analyzer = HealthAnalyzer(self.quarantine)
         self.visualizer = MetricsVisualizer()
+        self.forecast_backend = forecast_backend
+        # Replica samples are combined into one regular series per service before forecasting
+        self.resampler = Resampler(resample_bucket, resample_aggregate, per_pod) if resample_bucket else None
+        self.forecast_pool = ForecastPool(
+            forecast_workers,
+            os.path.join(cache_dir, 'forecasts') if cache_dir else None,
+            warm_start,
+            forecast_backend
+        )
         self.logger = logging.getLogger(__name__)
+        self.cache = ParsedDataCache(cache_dir) if cache_dir else None
+        # Every restarts file is recorded as a snapshot taken at its modification time
+        self.history = RestartHistoryStore(history_db) if history_db else None
+        # Usage sketches of every metrics source, kept after the captures themselves are gone
+        self.sketch_history = SketchHistory(sketch_file) if sketch_file else None
+        if self.follow and not self.cache:
+            self.logger.warning("Follow mode needs a cache directory for its checkpoints; disabling it")
 
     def _extract_service_name(self, pod_name: str) -> str:
-        pattern = r'^([a-zA-Z-]+)-[a-f0-9]{8,10}-[a-z0-9]{5}'
-        match = re.match(pattern, pod_name)
-        return match.group(1) if match else pod_name
+        return workload_name(pod_name)
     
-    def _parse_duration(self, duration: str) -> float:
-        """Convert duration string to hours
-        Examples: "18h ago", "(25m3s ago)", "45m ago", "(2h15m ago)"
+    def _process_health_data(self, health_table: PodHealthTable) -> Set[str]:
+        # Pods that restarted or are crash looping, with the last restart in the past two hours
+        return health_table.problematic_services(window_hours=2)
+
+    def _build_recommendations(self, service_name: str, results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        metrics = {}
+        for resource in RESOURCES:
+            metrics[resource] = {
+                'recommendation': results[resource]['recommendation']['formatted'],
+                'forecast': results[resource]['forecast'],
+                'factors': results[resource]['factors']
+            }
+            if 'percentiles' in results[resource]:
+                metrics[resource]['percentiles'] = results[resource]['percentiles']
+        return {'service': service_name, 'metrics': metrics}
+
+    def analyze_services(self, service_metrics: Dict[str, MetricsStore]) -> Dict[str, Dict[str, Any]]:
+        """Analyze resource usage and generate recommendations for several services.
+
+        Every (service, resource) forecast is an independent task for the
+        forecast pool; services whose data is empty or whose forecast failed
+        get an empty dict.
         """
-        # Remove parentheses and "ago"  
-        duration = duration.replace("(", "").replace(")", "").replace(" ago", "")
-        hours = 0.0
-        
-        if 'h' in duration:
-            h_parts = duration.split('h')
-            hours += float(h_parts[0])
-            duration = h_parts[1] if len(h_parts) > 1 else ""
-            
-        if 'm' in duration:
-            m_parts = duration.split('m')
-            hours += float(m_parts[0]) / 60
-            duration = m_parts[1] if len(m_parts) > 1 else ""
-            
-        if 's' in duration:
-            s_parts = duration.split('s')
-            hours += float(s_parts[0]) / 3600
-            
-        return hours
-
-    def _process_single_health_line(self, line: str) -> str | None:
-        if "NAME" in line or not line.strip():
-            return None
-            
-        try:
-            parts = line.strip().split()
-            if len(parts) < 7:
-                return None
-                
-            name = parts[1]
-            status = parts[3]
-            restarts = parts[4]
-            age = " ".join(parts[5:7])
-            service = self._extract_service_name(name)
-            
-            restart_count = int(restarts.split('(')[0].strip())
-            hours_ago = self._parse_duration(age)
-            
-            if (restart_count > 0 or status == "CrashLoopBackOff") and hours_ago <= 2:
-                return service
-        except Exception as e:
-            self.logger.error(f"Failed to process line: {line.strip()}", exc_info=True)
-            
-        return None
-
-    def _process_health_data(self, health_data: List[str]) -> Set[str]:
-        problematic_services = set()
-        for line in health_data:
-            service = self._process_single_health_line(line)
-            if service:
-                problematic_services.add(service)
-        return problematic_services
-
-    def analyze_resource_usage(self, metrics_list: List[PodMetrics], service_name: str) -> Dict[str, Any]:
+        tasks = []
+        for service_name in sorted(service_metrics):
+            metrics = service_metrics[service_name]
+            if not len(metrics):
+                self.logger.warning("No metrics data for service: %s", service_name)
+                continue
+            if self.resampler:
+                df = self.resampler.resample(metrics)
+            else:
+                df = metrics.to_frame().set_index('timestamp')
+            tasks.extend(ForecastTask(service_name, resource, df[[resource]]) for resource in RESOURCES)
+
+        results: Dict[str, Dict[str, Any]] = {service_name: {} for service_name in service_metrics}
+        failed = set()
+        for result in self.forecast_pool.run(tasks):
+            if result.error is not None:
+                if result.service not in failed:
+                    self.logger.error("Failed to analyze resource usage for %s: %s", result.service, result.error)
+                failed.add(result.service)
+            else:
+                results[result.service][result.resource] = result.recommendation
+
+        return {
+            service_name: self._build_recommendations(service_name, results[service_name])
+            if len(results[service_name]) == len(RESOURCES) else {}
+            for service_name in sorted(service_metrics)
+        }
+
+    def analyze_sketches(self, sketches: SketchSet, services: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Percentile recommendations answered from usage sketches, without fitting any model."""
+        recommender = PercentileRecommender()
+        recommendations = {}
+        for service_name in sorted(services):
+            results = {}
+            for resource in RESOURCES:
+                sketch = sketches.get(service_name, resource)
+                if sketch is not None and sketch.count:
+                    results[resource] = recommender.recommend(sketch, resource)
+            if len(results) == len(RESOURCES):
+                recommendations[service_name] = self._build_recommendations(service_name, results)
+            else:
+                self.logger.warning("No metrics data for service: %s", service_name)
+                recommendations[service_name] = {}
+        return recommendations
+
+    def _sketch_metrics(self, metrics: MetricsStore) -> SketchSet:
+        """Sketch this run's samples per service, merged with the recorded sketches of earlier sources."""
+        sketches = self.processor.take_sketches()
+        if sketches.sample_count() != len(metrics):
+            # Cached and followed loads parse none or only part of the samples, so they are sketched here
+            sketches = SketchSet.from_store(metrics, self._extract_service_name)
+        if not self.sketch_history:
+            return sketches
+        if len(metrics):
+            source = self.metrics_path or ','.join(sorted(self.reader.perf_paths))
+            self.sketch_history.record(source, sketches)
+        return self.sketch_history.merged()
+
+    def analyze_resource_usage(self, metrics: MetricsStore, service_name: str) -> Dict[str, Any]:
         """Analyze resource usage and generate recommendations."""
-        try:
-            # Convert list of PodMetrics to DataFrame
-            df = pd.DataFrame([{
-                'timestamp': m.timestamp,
-                'cpu': m.cpu,
-                'memory': m.memory,
-                'name': m.name
-            } for m in metrics_list])
-            
-            if df.empty:
-                self.logger.warning(f"No metrics data for service: {service_name}")
-                return {}
-                
-            # Set timestamp as index
-            df.set_index('timestamp', inplace=True)
-            
-            recommender = ResourceRecommenderProphet()
-            cpu_rec = recommender.generate_recommendation(df, 'cpu')
-            memory_rec = recommender.generate_recommendation(df, 'memory')
-            
-            # Create recommendations dict
-            recommendations = {
-                'service': service_name,
-                'metrics': {
-                    'cpu': {
-                        'recommendation': cpu_rec['recommendation']['formatted'],
-                        'forecast': cpu_rec['forecast'],
-                        'factors': cpu_rec['factors']
-                    },
-                    'memory': {
-                        'recommendation': memory_rec['recommendation']['formatted'],
-                        'forecast': memory_rec['forecast'],
-                        'factors': memory_rec['factors']
-                    }
-                }
-            }
-            
-            return recommendations
-            
-        except Exception as e:
-            self.logger.error(f"Failed to analyze resource usage for {service_name}: {str(e)}")
-            return {}
+        return self.analyze_services({service_name: metrics})[service_name]
+
+    def _parse_metrics(self) -> MetricsStore:
+        # Compressed captures cannot be split into byte ranges, so they are streamed serially
+        if self.metrics_path and self.ingest_workers > 1 and not detect_compression(self.metrics_path):
+            return self.processor.process_file_parallel(self.metrics_path, self.ingest_workers)
+        return self.processor.process_blocks(self.reader.read_performance_blocks(), self.metrics_path or 'merged metrics')
+
+    def _follow_metrics(self) -> MetricsStore:
+        """Parse only the bytes appended since the last run and merge them with the persisted samples."""
+        clock = TimestampReconstructor(self.processor.date)
+        offset = 0
+        metrics = MetricsStore.empty()
+        checkpoint = None
+
+        state = self.cache.load_checkpoint(self.metrics_path)
+        if state:
+            previous_metrics, previous = state
+            size = self.cache.signature(self.metrics_path)[0]
+            if (previous['offset'] <= size
+                    and self.cache.head_hash(self.metrics_path, previous['offset']) == previous['head_hash']):
+                metrics, checkpoint = previous_metrics, previous
+                clock = TimestampReconstructor.from_state(previous['clock'])
+                offset = previous['offset']
+            else:
+                self.logger.warning("%s was truncated or rewritten; reparsing it from the start", self.metrics_path)
+                self.cache.reset_checkpoint(self.metrics_path)
+
+        new_metrics, offset = self.processor.process_file_from(self.metrics_path, offset, clock)
+        self.cache.append_checkpoint(self.metrics_path, new_metrics, {
+            'offset': offset,
+            'head_hash': self.cache.head_hash(self.metrics_path, offset),
+            'clock': clock.state()
+        }, checkpoint)
+        return MetricsStore.concat([metrics, new_metrics])
+
+    def _load_metrics(self, problematic_services: Set[str]) -> MetricsStore:
+        # Follow mode persists the full history, so it never filters what it parses
+        can_follow = bool(self.follow and self.cache and self.metrics_path)
+        follow = can_follow and not detect_compression(self.metrics_path)
+        if can_follow and not follow:
+            self.logger.warning("Follow mode needs an uncompressed file; parsing %s in full", self.metrics_path)
+
+        if self.pushdown and not follow:
+            if not problematic_services:
+                return MetricsStore.empty()
+            # Only metric lines of pods that can belong to a flagged service are parsed
+            self.processor.set_pod_filter(problematic_services)
+        else:
+            self.processor.set_pod_filter(None)
+
+        if follow:
+            return self._follow_metrics()
+        if not self.cache or not self.metrics_path:
+            return self._parse_metrics()
+
+        variant = self.processor.date
+        if self.processor.pod_prefixes is not None:
+            variant += ':' + hashlib.sha1(','.join(self.processor.pod_prefixes).encode()).hexdigest()
+        metrics = self.cache.load_metrics(self.metrics_path, variant)
+        if metrics is None:
+            signature = self.cache.signature(self.metrics_path)
+            metrics = self._parse_metrics()
+            self.cache.save_metrics(self.metrics_path, metrics, signature, variant)
+        return metrics
+
+    def _load_health_file(self, path: str) -> PodHealthTable:
+        if not self.cache:
+            return self.health_analyzer.parse_blocks(self.reader.read_health_blocks(paths=[path]), path)
+
+        health_table = self.cache.load_health(path)
+        if health_table is None:
+            signature = self.cache.signature(path)
+            health_table = self.health_analyzer.parse_blocks(self.reader.read_health_blocks(paths=[path]), path)
+            self.cache.save_health(path, health_table, signature)
+        return health_table
+
+    def _load_health(self) -> PodHealthTable:
+        tables = []
+        for path in self.reader.health_paths:
+            health_table = self._load_health_file(path)
+            if self.history:
+                self.history.append_snapshot(health_table, os.path.getmtime(path))
+            tables.append(health_table)
+        return PodHealthTable.concat(tables)
+
+    def _load_problematic_services(self) -> Set[str]:
+        return self._process_health_data(self._load_health())
 
     def run_analysis(self):
-        perf_data = self.reader.read_performance_data()
-        health_data = self.reader.read_health_data()
-        metrics = self.processor.process_metrics(perf_data)
-        problematic_services = self._process_health_data(health_data)
+        # Unparsable lines of this run replace those of the previous one in the quarantine file
+        with self.quarantine:
+            # The small restarts file is parsed first so its flagged services can filter the metrics parse
+            problematic_services = self._load_problematic_services()
+            metrics = self._load_metrics(problematic_services)
+        self.quarantine.log_summary()
+        
+        service_index = metrics.group_by_pod_key(self._extract_service_name)
         
-        service_recommendations = {}
-        for service in problematic_services:
-            service_metrics = [m for m in metrics if service in self._extract_service_name(m.name)]
-            if service_metrics:
-                self.visualizer.visualize_metrics(service_metrics, service)
-                self.visualizer.create_resource_analysis(service_metrics, service)
-                service_recommendations[service] = self.analyze_resource_usage(service_metrics, service)
+        services = (set(service_index.keys()) | problematic_services) if self.all_services else problematic_services
+        services_metrics = {}
+        for service in services:
+            service_metrics = metrics.take(service_index.indices(service))
+            if len(service_metrics):
+                # Only flagged services are plotted, however many are forecast
+                if service in problematic_services:
+                    self.visualizer.visualize_metrics(service_metrics, service)
+                    self.visualizer.create_resource_analysis(service_metrics, service)
+                services_metrics[service] = service_metrics
+
+        if self.forecast_backend == 'percentile' or self.sketch_history:
+            sketches = self._sketch_metrics(metrics)
+        if self.forecast_backend == 'percentile':
+            # Sketches already hold the percentiles, including those of earlier recorded captures
+            service_recommendations = self.analyze_sketches(sketches, services)
+        else:
+            # Forecasts for all services are collected first so they can run in parallel
+            service_recommendations = self.analyze_services(services_metrics)
         
         return problematic_services, service_recommendations
@@ -1,53 +1,316 @@
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import List, Optional
+from itertools import compress
+from operator import itemgetter
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+import os
+import numpy as np
 import pandas as pd
 import re
-from logs.log_config import setup_logging
-from .models import PodMetrics
+from common.data_reader import DEFAULT_BLOCK_SIZE, batch_lines, match_lines, unmatched_lines
+from common.quantity import cpu_millicores, memory_bytes
+from common.timestamps import TimestampReconstructor, seconds_of_day
+from logs.log_config import LogSampler, init_worker_logging, setup_logging, worker_logging_args
+from recommender_system.quantile_sketch import SketchSet
+from .metrics_store import MetricsStore
+from .quarantine import INVALID_CPU, INVALID_MEMORY, INVALID_TIME, MALFORMED, QuarantineSink, Rejects
+
+# One `kubectl top pods [-A]` sample per line: "[HH:MM:SS] [<namespace>] <pod name> <cpu> <memory>".
+# Every line matches exactly once: "[NAMESPACE] NAME CPU MEMORY" header rows and
+# lines skipped by `{skip}` match without captures, and anything else that is
+# not a sample is captured whole by the last group so it can be quarantined.
+# `{name_prefix}` tests the pod name, not the namespace.
+METRIC_LINE_TEMPLATE = (
+    r'^[ \t]*(?:\[([\d:]+)\][ \t]*(?:(?!NAMESPACE[ \t])(\S+)[ \t]+)??({name_prefix}(?!NAME[ \t])\S+)'
+    r'[ \t]+(\S+)[ \t]+(\S+)'
+    r'|\[[\d:]+\][ \t]*(?:NAMESPACE[ \t]+)?NAME[ \t][^\n]*{skip}|([^\n]*))[ \t]*\r?$'
+)
+METRIC_LINE_PATTERN = re.compile(METRIC_LINE_TEMPLATE.format(name_prefix='', skip=''), re.MULTILINE)
+# Timestamped lines of pods excluded by a prefix filter are skipped, not quarantined
+FILTERED_LINE_SKIP = r'|\[[\d:]+\][^\n]*'
+RANGE_BYTES = 64 * 1024 * 1024  # upper bound on the text a parallel worker holds at once
+
+class ParsedBlock(NamedTuple):
+    """Columns parsed from one block, with times still as seconds since midnight."""
+    seconds: np.ndarray
+    cpu: np.ndarray
+    memory: np.ndarray
+    pod_codes: np.ndarray
+    pod_names: List[str]
+    line_count: int
+    rejects: Rejects
+    sketches: Optional[SketchSet] = None  # set by workers that sketch their range where they parse it
+
+def _prefix_trie_pattern(prefixes: Iterable[str]) -> str:
+    """Build a regex matching any of `prefixes`, factored as a trie so shared leading characters are tested once."""
+    trie: Dict[str, dict] = {}
+    for prefix in prefixes:
+        node = trie
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        if '' in node:
+            return ''  # a shorter prefix already matches everything below it
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items())]
+        return branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+
+    return build(trie)
+
+def compile_metric_pattern(pod_prefixes: Optional[Iterable[str]] = None) -> re.Pattern:
+    """Compile the metric line pattern, optionally only matching pods whose name starts with a prefix.
+
+    The prefix test runs inside the same regex pass, so lines for other pods
+    are rejected before they are tokenized or have their timestamp parsed.
+    """
+    if pod_prefixes is None:
+        return METRIC_LINE_PATTERN
+    prefixes = sorted(set(pod_prefixes))
+    name_prefix = f"(?={_prefix_trie_pattern(prefixes)})" if prefixes else '(?!)'
+    return re.compile(METRIC_LINE_TEMPLATE.format(name_prefix=name_prefix, skip=FILTERED_LINE_SKIP), re.MULTILINE)
+
+def _field_rejects(frame: pd.DataFrame, mask: np.ndarray, reason: str) -> Rejects:
+    """Rejects for matched lines whose fields do not convert, rebuilt from the fields."""
+    rows = frame[mask]
+    names = (rows['namespace'] + ' ' + rows['name']).str.lstrip()
+    lines = '[' + rows['time'] + '] ' + names + ' ' + rows['cpu'] + ' ' + rows['memory']
+    return Rejects(rows['line_number'].to_numpy(), [reason] * len(rows), lines.tolist())
+
+def parse_block(text: str, pattern: re.Pattern = METRIC_LINE_PATTERN) -> ParsedBlock:
+    """Parse a block of lines with a single compiled regex pass and column-wise conversions.
+
+    Lines that are not samples, or whose timestamp or quantities do not
+    parse, are dropped and returned as rejects with their line numbers in
+    the block; the caller decides where they go.
+    """
+    line_count, matches = match_lines(pattern, text)
+    rejects = []
+    malformed = unmatched_lines(matches, 5)
+    if malformed:
+        rejects.append(Rejects(
+            np.array(malformed, dtype=np.int64) + 1,
+            [MALFORMED] * len(malformed),
+            [matches[i][5].rstrip() for i in malformed]
+        ))
+
+    # Blank lines, header rows and lines skipped by a pod filter have no fields
+    line_numbers = [i + 1 for i in compress(range(line_count), map(itemgetter(0), matches))]
+    frame = pd.DataFrame([m for m in matches if m[0]], columns=['time', 'namespace', 'name', 'cpu', 'memory', 'line'])
+    frame['line_number'] = np.array(line_numbers, dtype=np.int64)
+
+    seconds = seconds_of_day(frame['time'].to_numpy())
+    cpu = cpu_millicores(frame['cpu'])
+    memory = memory_bytes(frame['memory'])
+    invalid = np.zeros(len(frame), dtype=bool)
+    for mask, reason in ((seconds < 0, INVALID_TIME), (np.isnan(cpu), INVALID_CPU), (np.isnan(memory), INVALID_MEMORY)):
+        mask = mask & ~invalid
+        if mask.any():
+            rejects.append(_field_rejects(frame, mask, reason))
+            invalid |= mask
+    if invalid.any():
+        valid = ~invalid
+        frame, seconds, cpu, memory = frame[valid], seconds[valid], cpu[valid], memory[valid]
+
+    names = frame['name']
+    namespaced = frame['namespace'].to_numpy(dtype=bool)
+    if namespaced.any():
+        # Pods of `kubectl top pods -A` captures are named "namespace/pod", so equal names in two namespaces stay apart
+        names = names.where(~namespaced, frame['namespace'] + '/' + names)
+    pod_codes, pod_names = pd.factorize(names)
+    return ParsedBlock(
+        seconds,
+        cpu,
+        memory,
+        pod_codes.astype(np.int32),
+        list(pod_names),
+        line_count,
+        Rejects.concat(rejects)
+    )
+
+def split_byte_ranges(path: str, parts: int) -> List[Tuple[int, int]]:
+    """Split a file into at least `parts` (start, end) byte ranges that begin at line starts."""
+    size = os.path.getsize(path)
+    parts = max(parts, -(-size // RANGE_BYTES))
+    boundaries = [0]
+    with open(path, 'rb') as f:
+        for i in range(1, parts):
+            f.seek(max(size * i // parts - 1, boundaries[-1]))
+            f.readline()
+            position = f.tell()
+            if position >= size:
+                break
+            if position > boundaries[-1]:
+                boundaries.append(position)
+    boundaries.append(size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+def sketch_block(parsed: ParsedBlock, key: Callable[[str], str]) -> SketchSet:
+    """Quantile sketches of a parsed block's samples, grouped by a key of the pod name."""
+    return SketchSet.from_columns(parsed.cpu, parsed.memory, parsed.pod_codes, parsed.pod_names, key)
+
+def parse_byte_range(path: str, start: int, end: int, pattern: re.Pattern = METRIC_LINE_PATTERN,
+                     sketch_key: Optional[Callable[[str], str]] = None) -> ParsedBlock:
+    """Process pool worker: parse the whole lines in [start, end) of a file, sketching them by `sketch_key` if given."""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode('utf-8', errors='replace')
+    parsed = parse_block(text, pattern)
+    if sketch_key is not None:
+        parsed = parsed._replace(sketches=sketch_block(parsed, sketch_key))
+    return parsed
 
 class MetricsProcessor:
-    def __init__(self, date: str = None):
+    def __init__(self, date: str = None, quarantine: Optional[QuarantineSink] = None,
+                 sketch_key: Optional[Callable[[str], str]] = None):
         self.date = date or datetime.now().strftime('%Y-%m-%d')
-        self.logger = setup_logging()
-    
-    def _parse_metric_line(self, line: str, timestamp: datetime) -> PodMetrics:
-        parts = line.split()
-        if len(parts) >= 3:
-            return PodMetrics(
-                name=" ".join(parts[:-2]),
-                cpu=parts[-2],
-                memory=parts[-1],
-                timestamp=timestamp
-            )
-        return None
+        self.logger = setup_logging(name=__name__)
+        self.sampler = LogSampler(self.logger)
+        # Unparsable lines are counted (and written out, if the sink has a file) instead of logged
+        self.quarantine = quarantine or QuarantineSink()
+        self.rejected = 0
+        self.pod_prefixes = None
+        self.line_pattern = METRIC_LINE_PATTERN
+        # With a key (a module-level function, so workers can unpickle it), every parsed block is
+        # sketched per key as it is converted and merged into `sketches`
+        self.sketch_key = sketch_key
+        self.sketches = SketchSet()
 
-    def process_metrics(self, lines: List[str]) -> List[PodMetrics]:
-        if not lines:
-            self.logger.warning("No metrics data provided")
-            return []
-            
-        metrics = []
-        
-        for line in lines:
-            line = line.strip()
-            timestamp_match = re.match(r'\[([\d:]+)\]', line)
-            
-            if not timestamp_match:
-                continue
-                
+    def set_pod_filter(self, pod_prefixes: Optional[Iterable[str]]):
+        """Only parse samples for pods whose names start with one of `pod_prefixes` (None parses all)."""
+        self.pod_prefixes = None if pod_prefixes is None else sorted(set(pod_prefixes))
+        self.line_pattern = compile_metric_pattern(self.pod_prefixes)
+
+    def _to_store(self, parsed: ParsedBlock, clock: TimestampReconstructor,
+                  source: str, first_line: int) -> MetricsStore:
+        if len(parsed.rejects.lines):
+            self.rejected += len(parsed.rejects.lines)
+            self.quarantine.add(source, parsed.rejects, first_line)
+        if self.sketch_key is not None:
+            sketches = parsed.sketches if parsed.sketches is not None else sketch_block(parsed, self.sketch_key)
+            self.sketches.merge(sketches)
+        return MetricsStore(
+            clock.convert(parsed.seconds),
+            parsed.cpu,
+            parsed.memory,
+            parsed.pod_codes,
+            parsed.pod_names
+        )
+
+    def take_sketches(self) -> SketchSet:
+        """The sketches of every block parsed since the last call."""
+        sketches, self.sketches = self.sketches, SketchSet()
+        return sketches
+
+    def _log_summary(self):
+        """Log the problems counted while parsing once, instead of once per block."""
+        if self.rejected:
+            self.logger.warning("Quarantined %d unparsable metrics lines", self.rejected)
+            self.rejected = 0
+        self.sampler.summary()
+
+    def process_blocks(self, blocks: Iterable[str], source: str = 'metrics') -> MetricsStore:
+        """Parse metrics from text blocks that end on line boundaries, e.g. DataReader.read_performance_blocks.
+
+        Timestamps are reconstructed across blocks, so captures that cross
+        midnight continue on the next day instead of wrapping around.
+        """
+        clock = TimestampReconstructor(self.date)
+        stores = []
+        block_count = 0
+        line = 1
+
+        for block in blocks:
+            block_count += 1
             try:
-                time_str = timestamp_match.group(1)
-                current_timestamp = pd.to_datetime(f"{self.date} {time_str}")
-                line = re.sub(r'\[[\d:]+\]\s*', '', line)
-                
-                if "NAME" not in line and line.strip():
-                    metric = self._parse_metric_line(line, current_timestamp)
-                    if metric:
-                        metrics.append(metric)
-            except ValueError as e:
-                self.logger.error(f"Error parsing timestamp: {self.date} {time_str}")
-            except Exception as e:
-                self.logger.error(f"Unexpected error processing line: {line}", exc_info=True)
-        
-        self.logger.info(f"Processed {len(metrics)} metrics")
-        return metrics
+                parsed = parse_block(block, self.line_pattern)
+                stores.append(self._to_store(parsed, clock, source, line))
+                line += parsed.line_count
+            except Exception:
+                self.sampler.error('block error', "Unexpected error processing metrics block %d", block_count,
+                                   exc_info=True)
+                line += block.count('\n')
+
+        if not block_count:
+            self.logger.warning("No metrics data provided")
+            return MetricsStore.empty()
+
+        store = MetricsStore.concat(stores)
+        self._log_summary()
+        self.logger.info("Processed %d metrics (%d bytes)", len(store), store.nbytes)
+        return store
+
+    def process_file_parallel(self, path: str, workers: int = None) -> MetricsStore:
+        """Parse a metrics file in a process pool, one line-aligned byte range per task.
+
+        Workers return columnar blocks with times still as seconds since
+        midnight; the blocks are converted in file order here so day rollover
+        is tracked across range boundaries, then concatenated as arrays.
+        """
+        workers = workers or os.cpu_count() or 1
+        try:
+            ranges = split_byte_ranges(path, workers)
+        except OSError as e:
+            self.logger.error("Error reading performance file: %s", e)
+            return MetricsStore.empty()
+
+        self.logger.info("Parsing %s in %s ranges with %s workers", path, len(ranges), workers)
+        clock = TimestampReconstructor(self.date)
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker_logging,
+                                 initargs=worker_logging_args()) as executor:
+            parsed_blocks = executor.map(
+                parse_byte_range,
+                [path] * len(ranges),
+                [start for start, _ in ranges],
+                [end for _, end in ranges],
+                [self.line_pattern] * len(ranges),
+                [self.sketch_key] * len(ranges)
+            )
+            # Workers number lines within their range; ranges are consumed in order to make them file-relative
+            stores = []
+            line = 1
+            for parsed in parsed_blocks:
+                stores.append(self._to_store(parsed, clock, path, line))
+                line += parsed.line_count
+
+        store = MetricsStore.concat(stores)
+        self._log_summary()
+        self.logger.info("Processed %d metrics (%d bytes)", len(store), store.nbytes)
+        return store
+
+    def process_file_from(self, path: str, offset: int, clock: TimestampReconstructor) -> Tuple[MetricsStore, int]:
+        """Parse the complete lines appended to a file after byte `offset`.
+
+        A trailing line without a newline is assumed to still be written and
+        is left for the next call. Returns the new samples and the offset to
+        resume from; `clock` carries the timestamp context between calls.
+        """
+        stores = []
+        # Line numbers count from the resume offset, as earlier lines are not read again
+        source = f"{path}@{offset}"
+        line = 1
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            while True:
+                chunk = f.read(DEFAULT_BLOCK_SIZE)
+                if not chunk:
+                    break
+                if not chunk.endswith(b'\n'):
+                    chunk += f.readline()
+                complete = chunk[:chunk.rfind(b'\n') + 1]
+                if complete:
+                    parsed = parse_block(complete.decode('utf-8', errors='replace'), self.line_pattern)
+                    stores.append(self._to_store(parsed, clock, source, line))
+                    line += parsed.line_count
+                    offset += len(complete)
+                if len(complete) < len(chunk):
+                    break
+
+        store = MetricsStore.concat(stores)
+        self._log_summary()
+        self.logger.info("Processed %d new metrics from %s up to byte %d", len(store), path, offset)
+        return store, offset
+
+    def process_metrics(self, lines: Iterable[str], source: str = 'metrics') -> MetricsStore:
+        """Parse metrics from any iterable of lines, batching them through the block parser."""
+        return self.process_blocks(batch_lines(lines), source)
@@ -0,0 +1,130 @@
+from typing import Callable, Dict, List, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+class MetricsStore:
+    """Columnar container for pod samples.
+
+    Timestamps are int64 epoch nanoseconds, cpu is float millicores, memory is
+    float bytes and pod names are dictionary-encoded: ``pod_codes`` indexes
+    into ``pod_names``. Slices share the name dictionary with their parent.
+    """
+
+    def __init__(self,
+                 timestamps: np.ndarray,
+                 cpu: np.ndarray,
+                 memory: np.ndarray,
+                 pod_codes: np.ndarray,
+                 pod_names: Sequence[str]):
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.cpu = np.asarray(cpu, dtype=np.float64)
+        self.memory = np.asarray(memory, dtype=np.float64)
+        self.pod_codes = np.asarray(pod_codes, dtype=np.int32)
+        self.pod_names = list(pod_names)
+
+    @classmethod
+    def empty(cls) -> 'MetricsStore':
+        return cls(np.empty(0, np.int64), np.empty(0), np.empty(0), np.empty(0, np.int32), [])
+
+    @classmethod
+    def concat(cls, stores: Sequence['MetricsStore']) -> 'MetricsStore':
+        """Concatenate stores, remapping each pod dictionary onto a shared one."""
+        stores = [s for s in stores if len(s)]
+        if not stores:
+            return cls.empty()
+        if len(stores) == 1:
+            return stores[0]
+
+        name_to_code: Dict[str, int] = {}
+        codes = []
+        for store in stores:
+            remap = np.array(
+                [name_to_code.setdefault(name, len(name_to_code)) for name in store.pod_names],
+                dtype=np.int32
+            )
+            codes.append(remap[store.pod_codes])
+
+        return cls(
+            np.concatenate([s.timestamps for s in stores]),
+            np.concatenate([s.cpu for s in stores]),
+            np.concatenate([s.memory for s in stores]),
+            np.concatenate(codes),
+            list(name_to_code)
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def nbytes(self) -> int:
+        return self.timestamps.nbytes + self.cpu.nbytes + self.memory.nbytes + self.pod_codes.nbytes
+
+    def take(self, indices: np.ndarray) -> 'MetricsStore':
+        """Return the samples at ``indices`` (an index array, slice or boolean mask)."""
+        return MetricsStore(
+            self.timestamps[indices],
+            self.cpu[indices],
+            self.memory[indices],
+            self.pod_codes[indices],
+            self.pod_names
+        )
+
+    def pod_codes_present(self) -> np.ndarray:
+        return np.unique(self.pod_codes)
+
+    def datetimes(self) -> np.ndarray:
+        return self.timestamps.view('datetime64[ns]')
+
+    def to_frame(self) -> pd.DataFrame:
+        """Wrap the columns in a DataFrame without boxing values into objects."""
+        return pd.DataFrame({
+            'timestamp': self.datetimes(),
+            'cpu': self.cpu,
+            'memory': self.memory,
+            'name': pd.Categorical.from_codes(self.pod_codes, categories=self.pod_names)
+        })
+
+    def group_by_pod_key(self, key: Callable[[str], str]) -> 'GroupIndex':
+        """Group samples by a key derived from the pod name, e.g. the owning service.
+
+        `key` runs once per distinct pod name, not once per sample.
+        """
+        return GroupIndex.build(self, key)
+
+class GroupIndex:
+    """Sample positions of a MetricsStore grouped by an exact key.
+
+    Samples are stably sorted by group once, so each group is a contiguous
+    range of ``order`` and a lookup is a dict access plus a slice. Within a
+    group samples keep their original (time) order.
+    """
+
+    def __init__(self, order: np.ndarray, ranges: Dict[str, Tuple[int, int]]):
+        self.order = order
+        self.ranges = ranges
+
+    @classmethod
+    def build(cls, store: MetricsStore, key: Callable[[str], str]) -> 'GroupIndex':
+        group_codes, groups = pd.factorize(pd.Series([key(name) for name in store.pod_names], dtype=object))
+        sample_groups = group_codes[store.pod_codes] if len(store) else np.empty(0, dtype=np.int64)
+        order = np.argsort(sample_groups, kind='stable')
+        bounds = np.searchsorted(sample_groups[order], np.arange(len(groups) + 1))
+        ranges = {
+            group: (int(bounds[code]), int(bounds[code + 1]))
+            for code, group in enumerate(groups)
+            if bounds[code + 1] > bounds[code]
+        }
+        return cls(order, ranges)
+
+    def __contains__(self, group: str) -> bool:
+        return group in self.ranges
+
+    def __len__(self) -> int:
+        return len(self.ranges)
+
+    def keys(self) -> List[str]:
+        return list(self.ranges)
+
+    def indices(self, group: str) -> np.ndarray:
+        start, end = self.ranges.get(group, (0, 0))
+        return self.order[start:end]
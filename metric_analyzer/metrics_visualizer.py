@@ -1,54 +1,53 @@
 import os
-import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
-from typing import List
 from logs.log_config import setup_logging
-from .models import PodMetrics
+from .metrics_store import MetricsStore
+
+BYTES_PER_MI = 1024 * 1024
 
 class MetricsVisualizer:
     def __init__(self):
         self.base_output_dir = "visualizations"
-        self.logger = setup_logging()
+        self.logger = setup_logging(name=__name__)
         os.makedirs(self.base_output_dir, exist_ok=True)
     
     def _get_service_dir(self, service_name: str) -> str:
         """Create and return service-specific output directory."""
         service_dir = os.path.join(self.base_output_dir, service_name)
         os.makedirs(service_dir, exist_ok=True)
-        self.logger.debug(f"Created output directory for service: {service_dir}")
+        self.logger.debug("Created output directory for service: %s", service_dir)
         return service_dir
 
-    def visualize_metrics(self, metrics: List[PodMetrics], service_name: str):
+    def visualize_metrics(self, metrics: MetricsStore, service_name: str):
         """
         Visualize metrics for a specific service.
         
         Args:
-            metrics (List[PodMetrics]): Metrics data to visualize
+            metrics (MetricsStore): Metrics data to visualize
             service_name (str): Name of the service being analyzed
         
         Returns:
             None
         """
-        if not metrics:
-            self.logger.warning(f"No metrics to visualize for service {service_name}")
+        if not len(metrics):
+            self.logger.warning("No metrics to visualize for service %s", service_name)
             return
             
-        self.logger.info(f"Creating visualization for service: {service_name}")
+        self.logger.info("Creating visualization for service: %s", service_name)
         
         service_dir = self._get_service_dir(service_name)
         
-        # Create DataFrame
-        df = pd.DataFrame([vars(m) for m in metrics])
-        self.logger.debug(f"Created DataFrame with columns: {df.columns.tolist()}")
+        timestamps = metrics.datetimes()
+        pod_codes = metrics.pod_codes_present()
         
         # Create subplots
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(15, 10))
         
         # Plot CPU
-        for pod in df['name'].unique():
-            pod_data = df[df['name'] == pod]
-            cpu_values = pod_data['cpu'].str.replace('m', '').astype(float)
-            ax1.plot(pod_data['timestamp'], cpu_values, label=pod, marker='.')
+        for code in pod_codes:
+            mask = metrics.pod_codes == code
+            ax1.plot(timestamps[mask], metrics.cpu[mask], label=metrics.pod_names[code], marker='.')
         
         ax1.set_title(f'{service_name} - CPU Usage Over Time')
         ax1.set_xlabel('Time')
@@ -57,10 +56,9 @@ class MetricsVisualizer:
         ax1.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
         
         # Plot Memory
-        for pod in df['name'].unique():
-            pod_data = df[df['name'] == pod]
-            memory_values = pod_data['memory'].str.replace('Mi', '').astype(float)
-            ax2.plot(pod_data['timestamp'], memory_values, label=pod, marker='.')
+        for code in pod_codes:
+            mask = metrics.pod_codes == code
+            ax2.plot(timestamps[mask], metrics.memory[mask] / BYTES_PER_MI, label=metrics.pod_names[code], marker='.')
         
         ax2.set_title(f'{service_name} - Memory Usage Over Time')
         ax2.set_xlabel('Time')
@@ -75,31 +73,31 @@ class MetricsVisualizer:
         plt.savefig(output_path, bbox_inches='tight')
         plt.close()
         
-        self.logger.info(f"Saved metrics visualization to {output_path}")
+        self.logger.info("Saved metrics visualization to %s", output_path)
     
-    def _plot_cpu(self, ax, df: pd.DataFrame):
-        for pod in df['name'].unique():
-            pod_data = df[df['name'] == pod]
-            cpu_values = pod_data['cpu'].str.replace('m', '').astype(float)
-            ax.plot(pod_data['timestamp'], cpu_values, label=pod.split('-')[-1], marker='.')
+    def _plot_cpu(self, ax, metrics: MetricsStore):
+        timestamps = metrics.datetimes()
+        for code in metrics.pod_codes_present():
+            mask = metrics.pod_codes == code
+            ax.plot(timestamps[mask], metrics.cpu[mask], label=metrics.pod_names[code].split('-')[-1], marker='.')
         
         ax.set_title('CPU Usage')
         ax.set_ylabel('CPU (millicores)')
         ax.grid(True)
         ax.legend()
     
-    def _plot_memory(self, ax, df: pd.DataFrame):
-        for pod in df['name'].unique():
-            pod_data = df[df['name'] == pod]
-            memory_values = pod_data['memory'].str.replace('Mi', '').astype(float)
-            ax.plot(pod_data['timestamp'], memory_values, label=pod.split('-')[-1], marker='.')
+    def _plot_memory(self, ax, metrics: MetricsStore):
+        timestamps = metrics.datetimes()
+        for code in metrics.pod_codes_present():
+            mask = metrics.pod_codes == code
+            ax.plot(timestamps[mask], metrics.memory[mask] / BYTES_PER_MI, label=metrics.pod_names[code].split('-')[-1], marker='.')
         
         ax.set_title('Memory Usage')
         ax.set_ylabel('Memory (Mi)')
         ax.grid(True)
         ax.legend()
 
-    def create_resource_analysis(self, metrics: List[PodMetrics], service_name: str):
+    def create_resource_analysis(self, metrics: MetricsStore, service_name: str):
         """Create detailed resource usage visualizations for a given service.
         This method generates a comprehensive visualization of resource metrics including:
         1. Resource Distribution Plot (CPU and Memory usage distribution)
@@ -107,7 +105,7 @@ class MetricsVisualizer:
         3. Pod scaling patterns showing pod count over time
         4. Resource efficiency distribution
         Args:
-            metrics (List[PodMetrics]): List of pod metric objects containing resource usage data
+            metrics (MetricsStore): Columnar pod samples containing resource usage data
             service_name (str): Name of the service to analyze
         Returns:
             None. Saves the generated plot as 'resource_analysis.png' in the service directory
@@ -119,20 +117,20 @@ class MetricsVisualizer:
         """
         """Create detailed resource usage visualizations."""
         service_dir = self._get_service_dir(service_name)
-        df = pd.DataFrame([vars(m) for m in metrics])
+        timestamps = metrics.datetimes()
         
         _ = plt.figure(figsize=(20, 15))
         
         # Resource Distribution Plot
         ax1 = plt.subplot(221)
-        cpu_values = df['cpu'].str.replace('m', '').astype(float)
-        memory_values = df['memory'].str.replace('Mi', '').astype(float)
+        cpu_values = metrics.cpu
+        memory_values = metrics.memory / BYTES_PER_MI
         ax1.boxplot([cpu_values, memory_values], labels=['CPU', 'Memory'])
         ax1.set_title('Resource Usage Distribution')
         
         # Usage Patterns
         ax2 = plt.subplot(222)
-        ax2.plot(df['timestamp'], cpu_values, label='CPU Usage')
+        ax2.plot(timestamps, cpu_values, label='CPU Usage')
         ax2.axhline(y=cpu_values.mean(), color='r', linestyle='--', label='Avg CPU')
         ax2.axhline(y=cpu_values.max(), color='g', linestyle='--', label='Peak CPU')
         ax2.set_title('Resource Usage Patterns')
@@ -140,8 +138,9 @@ class MetricsVisualizer:
         
         # Pod Scaling
         ax3 = plt.subplot(223)
-        pod_counts = df.groupby('timestamp')['name'].nunique()
-        ax3.plot(pod_counts.index, pod_counts.values)
+        sample_pairs = np.unique(np.stack([metrics.timestamps, metrics.pod_codes.astype(np.int64)]), axis=1)
+        count_times, pod_counts = np.unique(sample_pairs[0], return_counts=True)
+        ax3.plot(count_times.view('datetime64[ns]'), pod_counts)
         ax3.set_title('Pod Count Over Time')        
         
         # Memory Usage Patterns
@@ -149,8 +148,8 @@ class MetricsVisualizer:
         memory_timestamps = range(len(memory_values))  # Create time points
         
         # Calculate average and peak
-        avg_memory = sum(memory_values) / len(memory_values)
-        peak_memory = max(memory_values)
+        avg_memory = memory_values.mean()
+        peak_memory = memory_values.max()
         
         # Plot memory usage line
         ax4.plot(memory_timestamps, memory_values, color='purple', linewidth=2, label='Memory Usage')
@@ -171,4 +170,4 @@ class MetricsVisualizer:
         output_path = os.path.join(service_dir, 'resource_analysis.png')
         plt.savefig(output_path)
         plt.close()
-        self.logger.info(f"Saved resource analysis to {output_path}")
+        self.logger.info("Saved resource analysis to %s", output_path)
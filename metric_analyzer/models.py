@@ -1,10 +1,11 @@
 from dataclasses import dataclass
+from typing import Optional
 
 @dataclass
 class PodMetrics:
     name: str
-    cpu: str
-    memory: str
+    cpu: float  # millicores
+    memory: float  # bytes
     timestamp: str
 
 @dataclass
@@ -12,3 +13,7 @@ class PodHealth:
     name: str
     restarts: int
     status: str
+    namespace: str = ''
+    ready: str = ''
+    last_restart_age: Optional[float] = None  # seconds since the last restart
+    age: Optional[float] = None  # seconds since the pod was created
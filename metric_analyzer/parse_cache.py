@@ -0,0 +1,218 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+from .health_analyzer import PodHealthTable
+from .metrics_store import MetricsStore
+
+CACHE_VERSION = 5
+HASH_CHUNK_BYTES = 1024 * 1024
+HEAD_HASH_BYTES = 64 * 1024  # prefix hashed to detect a rotated or rewritten capture
+MAX_CHECKPOINT_SEGMENTS = 32
+
+Signature = Tuple[int, int]
+
+class ParsedDataCache:
+    """On-disk cache of parsed capture files stored as NPZ arrays.
+
+    Entries are keyed by the absolute path of the source file plus a variant
+    string describing parse settings that affect the result (such as the
+    capture date). Each entry records the file's size, mtime and a BLAKE2
+    hash of its contents: a matching size and mtime is a hit, and if only
+    the mtime differs the contents are rehashed so a touched but unchanged
+    file is still reused.
+    """
+
+    def __init__(self, cache_dir: str = "cache"):
+        self.cache_dir = cache_dir
+        self.logger = logging.getLogger(__name__)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def signature(path: str) -> Signature:
+        """Cheap fingerprint of a file; take it before parsing and pass it to save_*."""
+        stat = os.stat(path)
+        return stat.st_size, stat.st_mtime_ns
+
+    @staticmethod
+    def content_hash(path: str) -> str:
+        digest = hashlib.blake2b(digest_size=20)
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def head_hash(path: str, length: int) -> str:
+        """Hash of the first `length` bytes, used to check a followed file was only appended to."""
+        with open(path, 'rb') as f:
+            return hashlib.blake2b(f.read(min(length, HEAD_HASH_BYTES)), digest_size=20).hexdigest()
+
+    def _entry_path(self, path: str, kind: str) -> str:
+        key = hashlib.sha1(f"{kind}:{os.path.abspath(path)}".encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{kind}-{key}.npz")
+
+    def _load(self, path: str, kind: str, variant: str) -> Optional[Dict[str, np.ndarray]]:
+        entry_path = self._entry_path(path, kind)
+        if not os.path.exists(entry_path):
+            return None
+
+        try:
+            with np.load(entry_path) as entry:
+                arrays = {name: entry[name] for name in entry.files}
+            meta = json.loads(str(arrays.pop('meta')))
+            if (meta['version'] != CACHE_VERSION or meta['path'] != os.path.abspath(path)
+                    or meta['variant'] != variant):
+                return None
+
+            size, mtime_ns = self.signature(path)
+            if size != meta['size']:
+                return None
+            if mtime_ns != meta['mtime_ns']:
+                if self.content_hash(path) != meta['content_hash']:
+                    return None
+                self._write(entry_path, dict(meta, mtime_ns=mtime_ns), arrays)
+
+            self.logger.info("Loaded cached %s data for %s", kind, path)
+            return arrays
+        except Exception as e:
+            self.logger.warning("Ignoring unreadable cache entry %s: %s", entry_path, e)
+            return None
+
+    def _save(self, path: str, kind: str, variant: str, arrays: Dict[str, np.ndarray], signature: Signature):
+        if self.signature(path) != signature:
+            self.logger.warning("%s changed while it was being parsed; not caching it", path)
+            return
+
+        size, mtime_ns = signature
+        meta = {
+            'version': CACHE_VERSION,
+            'path': os.path.abspath(path),
+            'variant': variant,
+            'size': size,
+            'mtime_ns': mtime_ns,
+            'content_hash': self.content_hash(path)
+        }
+        self._write(self._entry_path(path, kind), meta, arrays)
+        self.logger.info("Cached parsed %s data for %s", kind, path)
+
+    def _write(self, entry_path: str, meta: Dict, arrays: Dict[str, np.ndarray]):
+        self._write_arrays(entry_path, dict(arrays, meta=np.array(json.dumps(meta))))
+
+    @staticmethod
+    def _write_arrays(entry_path: str, arrays: Dict[str, np.ndarray]):
+        tmp_path = f"{entry_path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, entry_path)
+
+    @staticmethod
+    def _metrics_arrays(store: MetricsStore) -> Dict[str, np.ndarray]:
+        return {
+            'timestamps': store.timestamps,
+            'cpu': store.cpu,
+            'memory': store.memory,
+            'pod_codes': store.pod_codes,
+            'pod_names': np.array(store.pod_names, dtype=str)
+        }
+
+    @staticmethod
+    def _metrics_from_arrays(arrays: Dict[str, np.ndarray]) -> MetricsStore:
+        return MetricsStore(
+            arrays['timestamps'],
+            arrays['cpu'],
+            arrays['memory'],
+            arrays['pod_codes'],
+            arrays['pod_names'].tolist()
+        )
+
+    def load_metrics(self, path: str, variant: str = '') -> Optional[MetricsStore]:
+        arrays = self._load(path, 'metrics', variant)
+        if arrays is None:
+            return None
+        return self._metrics_from_arrays(arrays)
+
+    def save_metrics(self, path: str, store: MetricsStore, signature: Signature, variant: str = ''):
+        self._save(path, 'metrics', variant, self._metrics_arrays(store), signature)
+
+    def _checkpoint_dir(self, path: str) -> str:
+        return self._entry_path(path, 'follow')[:-len('.npz')]
+
+    def load_checkpoint(self, path: str) -> Optional[Tuple[MetricsStore, Dict[str, Any]]]:
+        """Load the samples parsed so far from a followed file and its checkpoint."""
+        checkpoint_path = os.path.join(self._checkpoint_dir(path), 'checkpoint.json')
+        if not os.path.exists(checkpoint_path):
+            return None
+
+        try:
+            with open(checkpoint_path) as f:
+                checkpoint = json.load(f)
+            if checkpoint['version'] != CACHE_VERSION or checkpoint['path'] != os.path.abspath(path):
+                return None
+            segments = []
+            for segment in checkpoint['segments']:
+                with np.load(os.path.join(self._checkpoint_dir(path), segment)) as entry:
+                    segments.append(self._metrics_from_arrays({name: entry[name] for name in entry.files}))
+            return MetricsStore.concat(segments), checkpoint
+        except Exception as e:
+            self.logger.warning("Ignoring unreadable checkpoint for %s: %s", path, e)
+            return None
+
+    def append_checkpoint(self, path: str, new_metrics: MetricsStore, checkpoint: Dict[str, Any],
+                          previous: Optional[Dict[str, Any]] = None):
+        """Persist newly parsed samples as a segment and advance the checkpoint.
+
+        Only the new samples are written; once there are more than
+        MAX_CHECKPOINT_SEGMENTS segments they are compacted into one.
+        """
+        checkpoint_dir = self._checkpoint_dir(path)
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        segments = list(previous['segments']) if previous else []
+        sequence = previous['sequence'] if previous else 0
+
+        if len(new_metrics):
+            sequence += 1
+            segment = f"segment-{sequence:08d}.npz"
+            self._write_arrays(os.path.join(checkpoint_dir, segment), self._metrics_arrays(new_metrics))
+            segments.append(segment)
+
+        stale = []
+        if len(segments) > MAX_CHECKPOINT_SEGMENTS:
+            merged = self.load_checkpoint(path)[0] if previous else MetricsStore.empty()
+            sequence += 1
+            compacted = f"segment-{sequence:08d}.npz"
+            self._write_arrays(
+                os.path.join(checkpoint_dir, compacted),
+                self._metrics_arrays(MetricsStore.concat([merged, new_metrics]))
+            )
+            stale, segments = segments, [compacted]
+
+        checkpoint = dict(
+            checkpoint,
+            version=CACHE_VERSION,
+            path=os.path.abspath(path),
+            segments=segments,
+            sequence=sequence
+        )
+        tmp_path = os.path.join(checkpoint_dir, 'checkpoint.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, os.path.join(checkpoint_dir, 'checkpoint.json'))
+
+        for segment in stale:
+            os.remove(os.path.join(checkpoint_dir, segment))
+
+    def reset_checkpoint(self, path: str):
+        shutil.rmtree(self._checkpoint_dir(path), ignore_errors=True)
+
+    def load_health(self, path: str, variant: str = '') -> Optional[PodHealthTable]:
+        arrays = self._load(path, 'health', variant)
+        if arrays is None:
+            return None
+        return PodHealthTable.from_arrays(arrays)
+
+    def save_health(self, path: str, table: PodHealthTable, signature: Signature, variant: str = ''):
+        self._save(path, 'health', variant, table.to_arrays(), signature)
@@ -0,0 +1,104 @@
+from collections import Counter
+import logging
+from typing import Dict, Iterable, List, NamedTuple, Optional
+import numpy as np
+
+# Reason codes recorded with every quarantined line
+MALFORMED = 'malformed'
+INVALID_TIME = 'invalid_time'
+INVALID_CPU = 'invalid_cpu'
+INVALID_MEMORY = 'invalid_memory'
+
+BUFFER_LINES = 10000
+
+class Rejects(NamedTuple):
+    """Lines a block parser rejected, with line numbers counted from 1 within the block."""
+    line_numbers: np.ndarray
+    reasons: List[str]
+    lines: List[str]
+
+    @classmethod
+    def empty(cls) -> 'Rejects':
+        return cls(np.empty(0, np.int64), [], [])
+
+    @classmethod
+    def concat(cls, rejects: Iterable['Rejects']) -> 'Rejects':
+        """Merge the rejects of one block, ordered by line number."""
+        rejects = [r for r in rejects if len(r.lines)]
+        if not rejects:
+            return cls.empty()
+        line_numbers = np.concatenate([r.line_numbers for r in rejects])
+        reasons = [reason for r in rejects for reason in r.reasons]
+        lines = [line for r in rejects for line in r.lines]
+        order = np.argsort(line_numbers, kind='stable')
+        return cls(line_numbers[order], [reasons[i] for i in order], [lines[i] for i in order])
+
+class QuarantineSink:
+    """Collects unparsable input lines instead of logging each one.
+
+    Rejected lines are counted per reason code and, if `path` is set and
+    the sink is open, written to that file as tab separated "source, line
+    number, reason, line" records. A run opens the sink with `with sink:`,
+    which starts the file and the counts afresh, so rerunning does not
+    repeat earlier runs' lines. Writes are buffered and go out in bulk every
+    `buffer_lines` records and on close().
+    """
+
+    def __init__(self, path: Optional[str] = None, buffer_lines: int = BUFFER_LINES):
+        self.path = path
+        self.buffer_lines = buffer_lines
+        self.logger = logging.getLogger(__name__)
+        self.counts: Counter = Counter()
+        self.buffer: List[str] = []
+        self.file = None
+
+    def open(self):
+        """Start a run: reset the counts and truncate the quarantine file."""
+        self.close()
+        self.counts.clear()
+        if self.path:
+            self.file = open(self.path, 'w', encoding='utf-8')
+
+    def __enter__(self) -> 'QuarantineSink':
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add(self, source: str, rejects: Rejects, first_line: int = 1):
+        """Record the rejects of a block whose first line is line `first_line` of `source`."""
+        if not len(rejects.lines):
+            return
+        self.counts.update(rejects.reasons)
+        if self.file is None:
+            return
+
+        line_numbers = (rejects.line_numbers + (first_line - 1)).tolist()
+        self.buffer.extend(
+            f"{source}\t{number}\t{reason}\t{line}\n"
+            for number, reason, line in zip(line_numbers, rejects.reasons, rejects.lines)
+        )
+        if len(self.buffer) >= self.buffer_lines:
+            self.flush()
+
+    def flush(self):
+        if self.buffer and self.file is not None:
+            self.file.writelines(self.buffer)
+            self.file.flush()
+            self.buffer = []
+
+    def summary(self) -> Dict[str, int]:
+        return dict(self.counts)
+
+    def log_summary(self):
+        for reason, count in sorted(self.counts.items()):
+            self.logger.warning("Quarantined %d lines: %s", count, reason)
+        if self.counts and self.path:
+            self.logger.warning("Quarantined lines written to %s", self.path)
+
+    def close(self):
+        if self.file is not None:
+            self.flush()
+            self.file.close()
+            self.file = None
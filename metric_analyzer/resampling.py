@@ -0,0 +1,69 @@
+import re
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+from .metrics_store import MetricsStore
+
+AGGREGATES = ('sum', 'mean', 'max')
+PERCENTILE_AGGREGATE = re.compile(r'^p(\d{1,2}(?:\.\d+)?)$')  # e.g. p95, p99.9
+
+def parse_aggregate(aggregate: str) -> str:
+    """Validate an aggregate name: sum, mean, max or pXX (a percentile)."""
+    if aggregate not in AGGREGATES and not PERCENTILE_AGGREGATE.match(aggregate):
+        raise ValueError(f"Unknown aggregate {aggregate!r}; expected one of {', '.join(AGGREGATES)} or pXX")
+    return aggregate
+
+def parse_bucket(bucket: str) -> str:
+    """Validate a bucket size, any positive pandas frequency such as 30s, 1min or 5min."""
+    try:
+        step = pd.Timedelta(to_offset(bucket))
+    except ValueError:
+        raise ValueError(f"Unknown bucket size {bucket!r}; expected a frequency such as 30s, 1min or 5min")
+    if step <= pd.Timedelta(0):
+        raise ValueError(f"Bucket size {bucket!r} must be positive")
+    return bucket
+
+class Resampler:
+    """Turns the samples of a service's replicas into one regular series per resource.
+
+    Samples are floored to `bucket` and combined per bucket with
+    `aggregate` across replicas. The series covers every bucket from the
+    first sample to the last; buckets without samples are NaN, so gaps stay
+    gaps instead of being closed up. With `per_pod` each pod first
+    contributes one value per bucket (the mean of its samples there), so
+    pods scraped more often do not weigh more and `sum` is the service's
+    total usage in the bucket; without it the raw samples are aggregated.
+    """
+
+    def __init__(self, bucket: str = '1min', aggregate: str = 'mean', per_pod: bool = True):
+        self.bucket = parse_bucket(bucket)
+        self.bucket_ns = pd.Timedelta(to_offset(bucket)).value
+        self.aggregate = parse_aggregate(aggregate)
+        self.per_pod = per_pod
+
+    def resample(self, metrics: MetricsStore) -> pd.DataFrame:
+        """cpu and memory per bucket, indexed by the bucket start as 'timestamp'."""
+        frame = pd.DataFrame({
+            'timestamp': metrics.timestamps // self.bucket_ns * self.bucket_ns,
+            'pod': metrics.pod_codes,
+            'cpu': metrics.cpu,
+            'memory': metrics.memory
+        })
+        if self.per_pod:
+            frame = frame.groupby(['timestamp', 'pod'], sort=False)[['cpu', 'memory']].mean()
+            grouped = frame.groupby(level='timestamp')
+        else:
+            grouped = frame.groupby('timestamp')[['cpu', 'memory']]
+
+        percentile = PERCENTILE_AGGREGATE.match(self.aggregate)
+        if percentile:
+            resampled = grouped.quantile(float(percentile.group(1)) / 100)
+        else:
+            resampled = grouped.agg(self.aggregate)
+
+        if len(resampled):
+            first, last = resampled.index.min(), resampled.index.max()
+            resampled = resampled.reindex(np.arange(first, last + self.bucket_ns, self.bucket_ns, dtype=np.int64))
+        resampled.index = resampled.index.to_numpy(dtype=np.int64).view('datetime64[ns]')
+        resampled.index.name = 'timestamp'
+        return resampled
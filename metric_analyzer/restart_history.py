@@ -0,0 +1,114 @@
+import logging
+import sqlite3
+import time
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from .health_analyzer import PodHealthTable
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pod_snapshots (
+    service TEXT NOT NULL,
+    namespace TEXT NOT NULL,
+    pod TEXT NOT NULL,
+    snapshot_ts INTEGER NOT NULL,   -- epoch seconds the snapshot was taken
+    status TEXT NOT NULL,
+    restarts INTEGER NOT NULL,
+    last_restart_ts INTEGER,        -- epoch seconds of the last restart, NULL if it never restarted
+    PRIMARY KEY (namespace, pod, snapshot_ts)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS pod_snapshots_service_ts ON pod_snapshots (service, snapshot_ts);
+CREATE INDEX IF NOT EXISTS pod_snapshots_ts ON pod_snapshots (snapshot_ts);
+"""
+
+# Restarts per pod snapshot inside [since, until]: the growth of the pod's
+# restart counter since its previous snapshot in the window. The first
+# snapshot of a pod counts one restart if its last restart falls inside the
+# window, so totals are a lower bound when snapshots are sparse.
+SNAPSHOT_RESTARTS_CTE = """
+WITH snapshot_restarts AS (
+    SELECT service, snapshot_ts,
+           COALESCE(
+               MAX(restarts - LAG(restarts) OVER (PARTITION BY namespace, pod ORDER BY snapshot_ts), 0),
+               CASE WHEN restarts > 0 AND last_restart_ts >= :since THEN 1 ELSE 0 END
+           ) AS restarts
+    FROM pod_snapshots
+    WHERE snapshot_ts BETWEEN :since AND :until {service_filter}
+)
+"""
+
+class RestartHistoryStore:
+    """Embedded SQLite store of health snapshots indexed by (service, timestamp).
+
+    Appending the same snapshot twice replaces it, so snapshot files can be
+    recorded again without double counting.
+    """
+
+    def __init__(self, db_path: str = "restart_history.db"):
+        self.db_path = db_path
+        self.logger = logging.getLogger(__name__)
+        self.connection = sqlite3.connect(db_path)
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def append_snapshot(self, table: PodHealthTable, snapshot_ts: float) -> int:
+        """Record every pod of a health snapshot taken at epoch seconds `snapshot_ts`."""
+        if not len(table):
+            return 0
+
+        frame = table.frame
+        snapshot_ts = int(snapshot_ts)
+        last_restart_ts = snapshot_ts - frame['last_restart_age'].to_numpy()
+        rows = zip(
+            table.services().tolist(),
+            frame['namespace'].tolist(),
+            frame['name'].tolist(),
+            [snapshot_ts] * len(frame),
+            frame['status'].astype(str).tolist(),
+            frame['restarts'].tolist(),
+            [None if np.isnan(ts) else int(ts) for ts in last_restart_ts]
+        )
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO pod_snapshots VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+        self.logger.info("Recorded %s pods from snapshot at %s in %s", len(frame), snapshot_ts, self.db_path)
+        return len(frame)
+
+    def services_with_restarts(self,
+                               min_restarts: int = 1,
+                               window_hours: float = 24,
+                               until: Optional[float] = None) -> Dict[str, int]:
+        """Services with at least `min_restarts` restarts in the `window_hours` before `until` (default now)."""
+        until = int(until if until is not None else time.time())
+        query = SNAPSHOT_RESTARTS_CTE.format(service_filter='') + """
+            SELECT service, SUM(restarts) AS total
+            FROM snapshot_restarts
+            GROUP BY service
+            HAVING total >= :min_restarts
+            ORDER BY total DESC, service
+        """
+        params = {'since': until - int(window_hours * 3600), 'until': until, 'min_restarts': min_restarts}
+        return dict(self.connection.execute(query, params).fetchall())
+
+    def restart_trend(self,
+                      service: Optional[str] = None,
+                      days: int = 7,
+                      bucket_hours: float = 24,
+                      until: Optional[float] = None) -> List[Tuple[str, int, int]]:
+        """Restarts per (service, bucket start epoch seconds) over the last `days`, oldest bucket first."""
+        until = int(until if until is not None else time.time())
+        since = until - days * 24 * 3600
+        bucket_seconds = int(bucket_hours * 3600)
+        query = SNAPSHOT_RESTARTS_CTE.format(
+            service_filter='AND service = :service' if service else ''
+        ) + """
+            SELECT service, :since + (snapshot_ts - :since) / :bucket_seconds * :bucket_seconds AS bucket_start,
+                   SUM(restarts)
+            FROM snapshot_restarts
+            GROUP BY service, bucket_start
+            ORDER BY bucket_start, service
+        """
+        params = {'since': since, 'until': until, 'service': service, 'bucket_seconds': bucket_seconds}
+        return self.connection.execute(query, params).fetchall()
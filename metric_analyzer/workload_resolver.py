@@ -0,0 +1,43 @@
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+# Generated pod suffixes and pod-template hashes use Kubernetes' "safe"
+# alphabet, which has no vowels and no 0/1/3, so ordinary words in a
+# workload name are not mistaken for them. After a replicaset hash or a
+# schedule time any 5 character suffix is accepted, since the hash already
+# marks the name as generated (e.g. "web-5c8d7f9b4-abcde").
+SAFE_CHARS = 'bcdfghjklmnpqrstvwxz2456789'
+NAME = r'[a-z0-9][-a-z0-9.]*'
+SUFFIX = r'[a-z0-9]{5}'
+
+# All naming schemes in one compiled matcher; alternatives are tried in order
+WORKLOAD_PATTERN = re.compile(rf'''^(?:
+      (?P<cronjob>{NAME})-\d{{8,10}}-{SUFFIX}                                           # <cronjob>-<scheduled time>-<suffix>
+    | (?P<deployment>{NAME})-(?:[{SAFE_CHARS}]{{6,10}}|[a-f0-9]{{8,10}})-{SUFFIX}       # <deployment>-<replicaset hash>-<suffix>
+    | (?P<statefulset>{NAME})-\d+                                                       # <statefulset>-<ordinal>
+    | (?P<daemonset_or_job>{NAME})-[{SAFE_CHARS}]{{5}}                                  # <daemonset or job>-<suffix>
+)$''', re.VERBOSE)
+
+RESOLVER_CACHE_SIZE = 131072
+
+class Workload(NamedTuple):
+    name: str
+    kind: str
+
+@lru_cache(maxsize=RESOLVER_CACHE_SIZE)
+def resolve_workload(pod_name: str) -> Workload:
+    """Resolve a pod name to the workload that owns it.
+
+    Handles Deployment, StatefulSet, DaemonSet, Job and CronJob naming; a
+    name that fits none of them is treated as a bare pod. Results are
+    memoized per distinct pod name.
+    """
+    match = WORKLOAD_PATTERN.match(pod_name)
+    if not match:
+        return Workload(pod_name, 'pod')
+    return Workload(match.group(match.lastgroup), match.lastgroup)
+
+def workload_name(pod_name: str) -> str:
+    # Pods of namespaced metrics captures are stored as "namespace/pod"
+    return resolve_workload(pod_name.rpartition('/')[2]).name
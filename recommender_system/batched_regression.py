@@ -0,0 +1,141 @@
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+from recommender_system.forecast_backend import (
+    FORECAST_FREQ, FORECAST_PERIODS, INTERVAL_WIDTH, build_recommendation, to_series
+)
+
+# (name, period in minutes, Fourier order, minimum span of the grid in minutes to include it)
+BATCH_SEASONALITIES = [
+    ('hourly', 60, 3, 0),
+    ('daily', 24 * 60, 4, 2 * 24 * 60)
+]
+
+class BatchedModel(NamedTuple):
+    grid: pd.DatetimeIndex     # common time grid the series were resampled onto
+    coefficients: np.ndarray   # one column of trend and Fourier coefficients per series
+    lower: np.ndarray          # per series residual quantiles bounding the prediction interval
+    upper: np.ndarray
+    first: np.ndarray          # per series index of its first observed grid point
+    mean: np.ndarray           # per series mean of the raw samples
+    seasonalities: List[Tuple[str, float, int]]
+
+class BatchedFourierRecommender:
+    """NumPy backend that fits a linear trend plus sub-daily Fourier terms to many series at once.
+
+    Every series is averaged onto one common time grid, so all of them share
+    a single design matrix and are solved together with one least squares
+    call on the stacked (grid x series) matrix. Grid points a series has no
+    samples for are filled from its neighbours for the solve but left out of
+    its residuals, and intervals are per series residual quantiles.
+    """
+    name = 'batched'
+    model_type = BatchedModel
+
+    def __init__(self, freq: str = FORECAST_FREQ, interval_width: float = INTERVAL_WIDTH,
+                 seasonalities: Sequence[Tuple[str, float, int, float]] = BATCH_SEASONALITIES):
+        self.freq = freq
+        self.step = pd.Timedelta(to_offset(freq))
+        self.interval_width = interval_width
+        self.seasonalities = list(seasonalities)
+
+    def _design(self, minutes: np.ndarray, span: float, seasonalities: List[Tuple[str, float, int]]) -> np.ndarray:
+        """Columns: intercept, trend over the grid span, then sin/cos pairs of each seasonality."""
+        columns = [np.ones_like(minutes), minutes / max(span, 1.0)]
+        for _, period, order in seasonalities:
+            angles = 2 * np.pi * np.outer(minutes / period, np.arange(1, order + 1))
+            columns.extend([np.sin(angles), np.cos(angles)])
+        return np.column_stack(columns)
+
+    def fit_batch(self, series: Sequence[pd.DataFrame]) -> BatchedModel:
+        """Fit every (ds, y) frame of `series` in one solve."""
+        ds = [frame['ds'].to_numpy(dtype='datetime64[ns]').view(np.int64) for frame in series]
+        y = [frame['y'].to_numpy(dtype=np.float64) for frame in series]
+        columns = np.repeat(np.arange(len(series)), [len(values) for values in y])
+        ds, y = np.concatenate(ds), np.concatenate(y)
+        valid = ~np.isnan(y)
+        ds, y, columns = ds[valid], y[valid], columns[valid]
+        if not len(y):
+            raise ValueError("Cannot fit empty series")
+
+        step = self.step.value
+        start = ds.min() // step * step
+        buckets = (ds - start) // step
+        n_points, n_series = int(buckets.max()) + 1, len(series)
+        grid = pd.date_range(pd.Timestamp(start), periods=n_points, freq=self.freq)
+
+        # Mean per (grid point, series) in one pass over all samples
+        flat = buckets * n_series + columns
+        counts = np.bincount(flat, minlength=n_points * n_series).reshape(n_points, n_series)
+        sums = np.bincount(flat, weights=y, minlength=n_points * n_series).reshape(n_points, n_series)
+        observed = counts > 0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            values = sums / counts
+        totals = counts.sum(axis=0)
+        if not totals.all():
+            raise ValueError("Cannot fit a series without samples")
+        filled = pd.DataFrame(values).interpolate(limit_direction='both').to_numpy()
+
+        minutes = np.arange(n_points) * (step / 60e9)
+        span = minutes[-1]
+        seasonalities = [(name, period, order) for name, period, order, min_span in self.seasonalities
+                         if span >= min_span]
+        design = self._design(minutes, span, seasonalities)
+        coefficients = np.linalg.lstsq(design, filled, rcond=None)[0]
+
+        residuals = np.where(observed, values - design @ coefficients, np.nan)
+        tail = (1 - self.interval_width) / 2
+        lower, upper = np.nanquantile(residuals, [tail, 1 - tail], axis=0)
+        return BatchedModel(grid, coefficients, lower, upper, observed.argmax(axis=0),
+                            sums.sum(axis=0) / totals, seasonalities)
+
+    def predict_batch(self, model: BatchedModel, periods: int = FORECAST_PERIODS) -> Tuple[pd.DatetimeIndex, np.ndarray, np.ndarray]:
+        """Grid plus `periods` future steps, the (time x series) point forecasts and the trend part of them."""
+        ds = pd.date_range(model.grid[0], periods=len(model.grid) + periods, freq=self.freq)
+        step_minutes = self.step.total_seconds() / 60
+        minutes = np.arange(len(ds)) * step_minutes
+        design = self._design(minutes, (len(model.grid) - 1) * step_minutes, model.seasonalities)
+        return ds, design @ model.coefficients, design[:, :2] @ model.coefficients[:2]
+
+    def _forecast_frame(self, model: BatchedModel, ds: pd.DatetimeIndex, yhat: np.ndarray,
+                        trend: np.ndarray, column: int) -> pd.DataFrame:
+        # A series' forecast starts at its own first sample, not at the start of the shared grid
+        first = model.first[column]
+        values = yhat[first:, column]
+        return pd.DataFrame({
+            'ds': ds[first:],
+            'yhat': values,
+            'yhat_lower': values + model.lower[column],
+            'yhat_upper': values + model.upper[column],
+            'trend': trend[first:, column]
+        })
+
+    def fit(self, series: pd.DataFrame, resource_type: Optional[str] = None,
+            series_id: Optional[str] = None) -> BatchedModel:
+        return self.fit_batch([series])
+
+    def predict(self, model: BatchedModel, periods: int = FORECAST_PERIODS, freq: str = FORECAST_FREQ) -> pd.DataFrame:
+        if freq != self.freq:
+            raise ValueError(f"A batched model forecasts on its {self.freq!r} grid, not {freq!r}")
+        ds, yhat, trend = self.predict_batch(model, periods)
+        return self._forecast_frame(model, ds, yhat, trend, 0)
+
+    def generate_recommendations(self, metrics: Sequence[pd.DataFrame],
+                                 resource_types: Sequence[str]) -> List[Dict[str, Any]]:
+        """Recommendations for many series at once; metrics[i] holds the resource_types[i] column.
+
+        Their forecast records cover the future periods only, not the history.
+        """
+        series = [to_series(frame, resource) for frame, resource in zip(metrics, resource_types)]
+        model = self.fit_batch(series)
+        ds, yhat, trend = self.predict_batch(model)
+        return [
+            build_recommendation(self._forecast_frame(model, ds, yhat, trend, column), model.mean[column], resource,
+                                 horizon=FORECAST_PERIODS)
+            for column, resource in enumerate(resource_types)
+        ]
+
+    def generate_recommendation(self, metrics_df: pd.DataFrame, resource_type: str = 'cpu',
+                                series_id: Optional[str] = None) -> Dict[str, Any]:
+        return self.generate_recommendations([metrics_df], [resource_type])[0]
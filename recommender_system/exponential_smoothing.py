@@ -0,0 +1,113 @@
+from typing import Any, Dict, NamedTuple, Optional
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+from recommender_system.forecast_backend import (
+    FORECAST_FREQ, FORECAST_PERIODS, INTERVAL_WIDTH, build_recommendation, to_series
+)
+
+ALPHA = 0.1  # level smoothing
+BETA = 0.02  # trend smoothing
+PHI = 0.9    # trend damping per step; the trend adds at most PHI / (1 - PHI) steps' worth
+INIT_STEPS = 10  # the initial level is the mean of this many first steps, not the first noisy one
+
+class HoltModel(NamedTuple):
+    ds: np.ndarray       # start of every grid step from the first to the last sample
+    fitted: np.ndarray   # one-step-ahead prediction for each step
+    level: np.ndarray    # smoothed level after each step
+    last_level: float
+    last_trend: float    # change per step
+    step_seconds: float  # grid step, the forecast frequency
+    lower: float         # residual quantiles bounding the one-step prediction interval
+    upper: float
+
+class HoltRecommender:
+    """Pure NumPy forecasting backend: Holt's linear exponential smoothing with a damped trend.
+
+    Samples are averaged onto a grid of `freq` steps, so the smoother sees
+    one value per step however many replicas report, and a forecast
+    horizon counts the same steps. Prediction intervals are quantiles of
+    the residuals of every raw sample against the one-step-ahead forecast,
+    widened over the horizon by the damped Holt forecast variance. Fits
+    take milliseconds, which suits the short horizons recommendations need.
+    """
+    name = 'holt'
+    model_type = HoltModel
+
+    def __init__(self, alpha: float = ALPHA, beta: float = BETA, phi: float = PHI,
+                 interval_width: float = INTERVAL_WIDTH, freq: str = FORECAST_FREQ):
+        self.alpha = alpha
+        self.beta = beta
+        self.phi = phi
+        self.interval_width = interval_width
+        self.freq = freq
+        self.step = pd.Timedelta(to_offset(freq))
+
+    def fit(self, series: pd.DataFrame, resource_type: Optional[str] = None, series_id: Optional[str] = None) -> HoltModel:
+        series = series[series['y'].notna()]
+        if series.empty:
+            raise ValueError("Cannot fit an empty series")
+        y = series['y'].to_numpy(dtype=np.float64)
+        ds = series['ds'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+        step = self.step.value
+        start = ds.min() // step * step
+        buckets = (ds - start) // step
+        counts = np.bincount(buckets)
+        sums = np.bincount(buckets, weights=y)
+
+        fitted = np.empty(len(counts))
+        levels = np.empty(len(counts))
+        first = np.flatnonzero(counts)[:INIT_STEPS]
+        level, trend = sums[first].sum() / counts[first].sum(), 0.0
+        alpha, beta, phi = self.alpha, self.beta, self.phi
+        for i, (total, count) in enumerate(zip(sums.tolist(), counts.tolist())):
+            prediction = level + phi * trend
+            fitted[i] = prediction
+            if count:
+                new_level = alpha * total / count + (1 - alpha) * prediction
+                trend = beta * (new_level - level) + (1 - beta) * phi * trend
+                level = new_level
+            else:
+                # A step without samples follows the forecast
+                level, trend = prediction, phi * trend
+            levels[i] = level
+
+        residuals = y - fitted[buckets]
+        tail = (1 - self.interval_width) / 2
+        lower, upper = np.quantile(residuals, [tail, 1 - tail])
+        grid = (start + np.arange(len(counts)) * step).view('datetime64[ns]')
+        return HoltModel(grid, fitted, levels, level, trend, self.step.total_seconds(), float(lower), float(upper))
+
+    def _damped_sum(self, steps: np.ndarray) -> np.ndarray:
+        """phi + phi^2 + ... + phi^steps"""
+        phi = self.phi
+        return steps if phi == 1 else phi * (1 - phi ** steps) / (1 - phi)
+
+    def _interval_scale(self, steps: np.ndarray) -> np.ndarray:
+        """Ratio of the h-step to the one-step forecast standard deviation of damped Holt."""
+        horizon = int(np.ceil(steps.max())) if len(steps) else 0
+        coefficients = self.alpha * (1 + self.beta * self._damped_sum(np.arange(1, horizon)))
+        variances = np.concatenate([[1.0], 1 + np.cumsum(coefficients ** 2)])
+        return np.sqrt(variances[np.clip(np.ceil(steps).astype(int) - 1, 0, horizon - 1)])
+
+    def predict(self, model: HoltModel, periods: int = FORECAST_PERIODS, freq: str = FORECAST_FREQ) -> pd.DataFrame:
+        last = pd.Timestamp(model.ds[-1])
+        future = pd.date_range(last, periods=periods + 1, freq=freq)[1:]
+        steps = (future - last).total_seconds().to_numpy() / model.step_seconds
+        future_yhat = model.last_level + model.last_trend * self._damped_sum(steps)
+
+        yhat = np.concatenate([model.fitted, future_yhat])
+        widen = np.concatenate([np.ones(len(model.fitted)), self._interval_scale(steps)])
+        return pd.DataFrame({
+            'ds': np.concatenate([model.ds, future.to_numpy(dtype='datetime64[ns]')]),
+            'yhat': yhat,
+            'yhat_lower': yhat + model.lower * widen,
+            'yhat_upper': yhat + model.upper * widen,
+            'trend': np.concatenate([model.level, future_yhat])
+        })
+
+    def generate_recommendation(self, metrics_df: pd.DataFrame, resource_type: str = 'cpu',
+                                series_id: Optional[str] = None) -> Dict[str, Any]:
+        series = to_series(metrics_df, resource_type)
+        model = self.fit(series, resource_type, series_id)
+        return build_recommendation(self.predict(model), series['y'].mean(), resource_type)
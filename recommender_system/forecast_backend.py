@@ -0,0 +1,141 @@
+import logging
+from typing import Any, Dict, Optional, Protocol
+import pandas as pd
+from common.quantity import cpu_millicores, memory_bytes
+
+FORECAST_PERIODS = 7
+FORECAST_FREQ = 'min'
+BUFFER = 1.2  # 20% headroom over the forecast peak
+INTERVAL_WIDTH = 0.6  # Narrower confidence intervals
+
+BACKENDS = ('prophet', 'holt', 'auto', 'percentile', 'batched')
+# With 'auto', series spanning at least this long go to Prophet; shorter ones to the NumPy engine
+AUTO_PROPHET_MIN_SPAN = pd.Timedelta(days=1)
+
+class ForecastBackend(Protocol):
+    """A forecasting engine that turns one metrics series into a recommendation.
+
+    fit() takes a Prophet-style frame (ds, y) and returns an engine specific
+    model; predict() returns ds, yhat, yhat_lower, yhat_upper and trend for
+    the history plus `periods` future steps; generate_recommendation() runs
+    both and returns the current_usage/recommendation/forecast/factors dict.
+    """
+    name: str
+
+    def fit(self, series: pd.DataFrame, resource_type: str, series_id: Optional[str] = None) -> Any: ...
+
+    def predict(self, model: Any, periods: int = FORECAST_PERIODS, freq: str = FORECAST_FREQ) -> pd.DataFrame: ...
+
+    def generate_recommendation(self, metrics_df: pd.DataFrame, resource_type: str = 'cpu',
+                                series_id: Optional[str] = None) -> Dict[str, Any]: ...
+
+def to_series(metrics_df: pd.DataFrame, resource_type: str) -> pd.DataFrame:
+    """The (ds, y) frame of one resource from a metrics frame indexed by timestamp, y as float64.
+
+    Samples from a MetricsStore are already millicores or bytes and pass
+    through; raw quantity strings are parsed with the shared parser.
+    """
+    series = metrics_df[[resource_type]].reset_index().rename(
+        columns={'timestamp': 'ds', resource_type: 'y'}
+    )
+    series['y'] = cpu_millicores(series['y']) if resource_type == 'cpu' else memory_bytes(series['y'])
+    return series
+
+def format_recommendation(value: float, resource_type: str) -> Dict[str, Any]:
+    """Format a value in stored units (millicores, bytes) with proper units and ranges."""
+    if resource_type == 'cpu':
+        # Floor at 0; the value is already in millicores
+        millicores = max(0, value)
+        return {
+            'raw_value': millicores,
+            'formatted': f"{int(millicores)}m",
+            'unit': 'millicores'
+        }
+    else:  # memory
+        # Convert bytes to Mi and floor at 0
+        memory_mi = max(0, value / (1024 * 1024))
+        return {
+            'raw_value': memory_mi,
+            'formatted': f"{int(memory_mi)}Mi",
+            'unit': 'Mi'
+        }
+
+def build_recommendation(forecast: pd.DataFrame, current_usage: float, resource_type: str,
+                         daily_pattern: bool = False, weekly_pattern: bool = False,
+                         horizon: Optional[int] = None) -> Dict[str, Any]:
+    """The recommendation every backend returns: peak of the upper forecast bound plus headroom.
+
+    With `horizon`, only the last `horizon` rows of the forecast are returned
+    as records, which keeps results for many series small.
+    """
+    peak_forecast = max(0, forecast['yhat_upper'].max())
+    records = forecast if horizon is None else forecast.tail(horizon)
+    return {
+        'current_usage': format_recommendation(current_usage, resource_type),
+        'recommendation': format_recommendation(peak_forecast * BUFFER, resource_type),
+        'forecast': records[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].to_dict('records'),
+        'factors': {
+            'trend': forecast['trend'].mean(),
+            'daily_pattern': daily_pattern,
+            'weekly_pattern': weekly_pattern,
+            'buffer': BUFFER
+        }
+    }
+
+class AutoBackend:
+    """Chooses Prophet for long series and the NumPy engine for short ones, per series.
+
+    Prophet is imported on first use; if it is not installed every series
+    goes to the NumPy engine.
+    """
+    name = 'auto'
+
+    def __init__(self, cache=None, warm_start: bool = False, min_prophet_span: pd.Timedelta = AUTO_PROPHET_MIN_SPAN):
+        from recommender_system.exponential_smoothing import HoltRecommender
+        self.logger = logging.getLogger(__name__)
+        self.cache = cache
+        self.warm_start = warm_start
+        self.min_prophet_span = min_prophet_span
+        self.fast = HoltRecommender()
+        self.prophet = None
+        self.prophet_available = True
+
+    def _backend_for(self, metrics_df: pd.DataFrame) -> ForecastBackend:
+        if len(metrics_df) < 2 or metrics_df.index.max() - metrics_df.index.min() < self.min_prophet_span:
+            return self.fast
+        if self.prophet is None and self.prophet_available:
+            try:
+                self.prophet = create_backend('prophet', self.cache, self.warm_start)
+            except ImportError as e:
+                self.logger.warning("Prophet is unavailable (%s); forecasting every series with %s", e, self.fast.name)
+                self.prophet_available = False
+        return self.prophet or self.fast
+
+    def fit(self, series: pd.DataFrame, resource_type: str, series_id: Optional[str] = None) -> Any:
+        return self._backend_for(series.set_index('ds')).fit(series, resource_type, series_id)
+
+    def predict(self, model: Any, periods: int = FORECAST_PERIODS, freq: str = FORECAST_FREQ) -> pd.DataFrame:
+        backend = self.fast if isinstance(model, self.fast.model_type) else self.prophet
+        return backend.predict(model, periods, freq)
+
+    def generate_recommendation(self, metrics_df: pd.DataFrame, resource_type: str = 'cpu',
+                                series_id: Optional[str] = None) -> Dict[str, Any]:
+        return self._backend_for(metrics_df).generate_recommendation(metrics_df, resource_type, series_id)
+
+def create_backend(name: str = 'prophet', cache=None, warm_start: bool = False) -> ForecastBackend:
+    """Instantiate a backend by name; Prophet is only imported when it is asked for."""
+    if name == 'prophet':
+        from recommender_system.resource_recommender import ResourceRecommenderProphet
+        return ResourceRecommenderProphet(cache, warm_start)
+    if name == 'holt':
+        from recommender_system.exponential_smoothing import HoltRecommender
+        return HoltRecommender()
+    if name == 'auto':
+        return AutoBackend(cache, warm_start)
+    if name == 'percentile':
+        from recommender_system.percentile_recommender import PercentileRecommender
+        return PercentileRecommender()
+    if name == 'batched':
+        from recommender_system.batched_regression import BatchedFourierRecommender
+        return BatchedFourierRecommender()
+    raise ValueError(f"Unknown forecast backend {name!r}; expected one of {', '.join(BACKENDS)}")
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, Optional
+import numpy as np
+import pandas as pd
+
+CACHE_VERSION = 2
+MAX_ENTRIES = 256
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, pd.Timestamp):
+        return {'__timestamp__': value.isoformat()}
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+def _decode(obj: Dict[str, Any]) -> Any:
+    if '__timestamp__' in obj:
+        return pd.Timestamp(obj['__timestamp__'])
+    return obj
+
+class ForecastCache:
+    """On-disk cache of forecast recommendations and warm start parameters.
+
+    Entries are keyed by a hash of the preprocessed series and of the model
+    configuration, so a series that has not changed since the last run is
+    answered without refitting. At most `max_entries` entries are kept; the
+    least recently used ones are evicted, with file mtimes as the clock.
+    """
+
+    def __init__(self, cache_dir: str = os.path.join("cache", "forecasts"), max_entries: int = MAX_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.logger = logging.getLogger(__name__)
+        self.params_dir = os.path.join(self.cache_dir, 'warm')
+        os.makedirs(self.params_dir, exist_ok=True)
+
+    @staticmethod
+    def key(series: pd.DataFrame, config: Dict[str, Any]) -> str:
+        """Fingerprint of a Prophet input frame (ds, y) and the configuration it is fitted with."""
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(json.dumps(config, sort_keys=True).encode())
+        digest.update(series['ds'].to_numpy(dtype='datetime64[ns]').view(np.int64).tobytes())
+        digest.update(series['y'].to_numpy(dtype=np.float64).tobytes())
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry (its 'result') for `key`, marking it recently used."""
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path) as f:
+                entry = json.load(f, object_hook=_decode)
+            if entry['version'] != CACHE_VERSION:
+                return None
+            os.utime(entry_path)
+            return entry
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning("Ignoring unreadable forecast cache entry %s: %s", entry_path, e)
+            return None
+
+    def save(self, key: str, result: Dict[str, Any]):
+        entry_path = self._entry_path(key)
+        # Writers in other worker processes use a different temporary name
+        tmp_path = f"{entry_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': CACHE_VERSION, 'result': result}, f, default=_encode)
+        os.replace(tmp_path, entry_path)
+        self._evict()
+
+    def _params_path(self, series_id: str, config: Dict[str, Any]) -> str:
+        key = hashlib.blake2b(f"{series_id}:{json.dumps(config, sort_keys=True)}".encode(), digest_size=20)
+        return os.path.join(self.params_dir, f"{key.hexdigest()}.json")
+
+    def load_params(self, series_id: str, config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Parameters of the last model fitted for `series_id` with this configuration."""
+        try:
+            with open(self._params_path(series_id, config)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning("Ignoring unreadable warm start parameters for %s: %s", series_id, e)
+            return None
+
+    def save_params(self, series_id: str, config: Dict[str, Any], params: Dict[str, Any]):
+        """Keep the latest fitted parameters of a series; one small file per series, not evicted."""
+        params_path = self._params_path(series_id, config)
+        tmp_path = f"{params_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(params, f)
+        os.replace(tmp_path, params_path)
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.json'):
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    entries.append((os.stat(path).st_mtime_ns, path))
+                except FileNotFoundError:
+                    pass
+        if len(entries) <= self.max_entries:
+            return
+
+        entries.sort()
+        for _, path in entries[:len(entries) - self.max_entries]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # already evicted by another worker
@@ -0,0 +1,88 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+import pandas as pd
+from logs.log_config import init_worker_logging, worker_logging_args
+from recommender_system.forecast_backend import create_backend
+from recommender_system.forecast_cache import ForecastCache
+
+RESOURCES = ('cpu', 'memory')
+
+class ForecastTask(NamedTuple):
+    service: str
+    resource: str
+    metrics: pd.DataFrame  # the resource column indexed by timestamp
+
+class ForecastResult(NamedTuple):
+    service: str
+    resource: str
+    recommendation: Optional[Dict[str, Any]]
+    error: Optional[str]
+
+def _make_recommender(backend: str, cache_dir: Optional[str], warm_start: bool):
+    # create_backend only imports Prophet when the backend needs it
+    return create_backend(backend, ForecastCache(cache_dir) if cache_dir else None, warm_start)
+
+def _forecast(recommender, task: ForecastTask) -> ForecastResult:
+    try:
+        recommendation = recommender.generate_recommendation(task.metrics, task.resource, task.service)
+        return ForecastResult(task.service, task.resource, recommendation, None)
+    except Exception as e:
+        # Failures are returned, not raised, so one bad series does not abort the batch
+        return ForecastResult(task.service, task.resource, None, str(e))
+
+def _forecast_batch(recommender, tasks: Sequence[ForecastTask]) -> List[ForecastResult]:
+    try:
+        recommendations = recommender.generate_recommendations(
+            [task.metrics for task in tasks], [task.resource for task in tasks]
+        )
+        return [ForecastResult(task.service, task.resource, recommendation, None)
+                for task, recommendation in zip(tasks, recommendations)]
+    except Exception as e:
+        return [ForecastResult(task.service, task.resource, None, str(e)) for task in tasks]
+
+# The recommender of a pool worker process, built once by the initializer and reused by every task
+_recommender = None
+
+def _init_worker(backend: str, cache_dir: Optional[str], warm_start: bool, log_queue, log_level: int):
+    """Process pool initializer: import the backend (e.g. Prophet) and build the recommender once per worker."""
+    global _recommender
+    init_worker_logging(log_queue, log_level)
+    _recommender = _make_recommender(backend, cache_dir, warm_start)
+
+def _run_in_worker(task: ForecastTask) -> ForecastResult:
+    return _forecast(_recommender, task)
+
+class ForecastPool:
+    """Runs (service, resource) forecasts in this process or spread over a process pool.
+
+    Results are returned in task order whatever order the workers finish in.
+    Backends with generate_recommendations() get every task in one call in
+    this process instead.
+    `backend` names the forecasting engine (see forecast_backend.BACKENDS).
+    Fitted models are cached under `cache_dir` when it is set, and with
+    `warm_start` each service's refit starts from its previous parameters.
+    """
+
+    def __init__(self, workers: int = 1, cache_dir: Optional[str] = None, warm_start: bool = False,
+                 backend: str = 'prophet'):
+        self.workers = max(1, workers)
+        self.backend = backend
+        self.cache_dir = cache_dir
+        self.warm_start = warm_start
+        self.recommender = None
+
+    def run(self, tasks: Sequence[ForecastTask]) -> List[ForecastResult]:
+        if not tasks:
+            return []
+        if self.workers == 1 or len(tasks) <= 1 or self.backend == 'batched':
+            if self.recommender is None:
+                self.recommender = _make_recommender(self.backend, self.cache_dir, self.warm_start)
+            if hasattr(self.recommender, 'generate_recommendations'):
+                # Batched backends solve every series together in this process
+                return _forecast_batch(self.recommender, tasks)
+            return [_forecast(self.recommender, task) for task in tasks]
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(tasks)),
+                                 initializer=_init_worker,
+                                 initargs=(self.backend, self.cache_dir, self.warm_start, *worker_logging_args())) as executor:
+            # Each fit takes far longer than shipping its series, so tasks are handed out one at a time
+            return list(executor.map(_run_in_worker, tasks))
@@ -0,0 +1,78 @@
+from typing import Any, Dict, NamedTuple, Optional
+import numpy as np
+import pandas as pd
+from recommender_system.forecast_backend import (
+    BUFFER, FORECAST_FREQ, FORECAST_PERIODS, format_recommendation, to_series
+)
+from recommender_system.quantile_sketch import RELATIVE_ACCURACY, QuantileSketch
+
+PERCENTILES = (50, 90, 95, 99)
+TARGET_PERCENTILE = 95  # the request covers this share of the observed usage before headroom
+
+class PercentileModel(NamedTuple):
+    sketch: QuantileSketch
+    last_ds: pd.Timestamp
+
+class PercentileRecommender:
+    """Forecasting backend that recommends a usage percentile plus headroom.
+
+    Samples go into a quantile sketch, so no model is fitted: the
+    recommendation is the target percentile times the buffer, and the
+    "forecast" is flat at the median with the target percentile as its
+    upper bound. recommend() answers directly from a sketch, which is how
+    sketches accumulated over many captures are turned into requests.
+    """
+    name = 'percentile'
+    model_type = PercentileModel
+
+    def __init__(self, target: int = TARGET_PERCENTILE, relative_accuracy: float = RELATIVE_ACCURACY):
+        self.target = target
+        self.relative_accuracy = relative_accuracy
+
+    def fit(self, series: pd.DataFrame, resource_type: Optional[str] = None,
+            series_id: Optional[str] = None) -> PercentileModel:
+        sketch = QuantileSketch(self.relative_accuracy)
+        sketch.update(series['y'].to_numpy(dtype=np.float64))
+        if not sketch.count:
+            raise ValueError("Cannot fit an empty series")
+        return PercentileModel(sketch, pd.Timestamp(series['ds'].max()))
+
+    def predict(self, model: PercentileModel, periods: int = FORECAST_PERIODS,
+                freq: str = FORECAST_FREQ) -> pd.DataFrame:
+        median, upper = model.sketch.quantiles([0.5, self.target / 100])
+        lower = model.sketch.quantile(1 - self.target / 100)
+        ds = pd.date_range(model.last_ds, periods=periods + 1, freq=freq)[1:]
+        return pd.DataFrame({
+            'ds': ds,
+            'yhat': median,
+            'yhat_lower': lower,
+            'yhat_upper': upper,
+            'trend': median
+        })
+
+    def recommend(self, sketch: QuantileSketch, resource_type: str) -> Dict[str, Any]:
+        """Recommendation straight from a sketch: target percentile plus headroom, and the usual percentiles."""
+        values = sketch.quantiles([p / 100 for p in PERCENTILES])
+        target = sketch.quantile(self.target / 100)
+        return {
+            'current_usage': format_recommendation(sketch.mean, resource_type),
+            'recommendation': format_recommendation(target * BUFFER, resource_type),
+            'forecast': [],
+            'factors': {
+                'percentile': self.target,
+                'samples': sketch.count,
+                'buffer': BUFFER
+            },
+            'percentiles': {
+                f"p{p}": format_recommendation(value, resource_type)['formatted']
+                for p, value in zip(PERCENTILES, values)
+            }
+        }
+
+    def generate_recommendation(self, metrics_df: pd.DataFrame, resource_type: str = 'cpu',
+                                series_id: Optional[str] = None) -> Dict[str, Any]:
+        model = self.fit(to_series(metrics_df, resource_type), resource_type, series_id)
+        recommendation = self.recommend(model.sketch, resource_type)
+        forecast = self.predict(model)
+        recommendation['forecast'] = forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].to_dict('records')
+        return recommendation
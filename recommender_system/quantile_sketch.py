@@ -0,0 +1,270 @@
+import json
+import logging
+import math
+import os
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Tuple
+import numpy as np
+
+RELATIVE_ACCURACY = 0.01  # quantiles are within 1% of a true sample value
+MAX_BUCKETS = 2048        # beyond this the lowest buckets are collapsed into one
+MIN_INDEXABLE = 1e-9      # smaller values (idle pods) are counted in the zero bucket
+SKETCH_VERSION = 1
+
+class QuantileSketch:
+    """Mergeable quantile sketch with relative error guarantees (DDSketch).
+
+    A sample x > 0 is counted in bucket ceil(log_gamma(x)) with
+    gamma = (1 + a) / (1 - a), so any quantile is answered within relative
+    accuracy `a` of a real sample. Adding a sample is one logarithm and one
+    counter increment, merging adds bucket counts, and the serialized form
+    holds counts only, so it stays small however many samples it summarizes.
+    """
+
+    def __init__(self, relative_accuracy: float = RELATIVE_ACCURACY, max_buckets: int = MAX_BUCKETS):
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.counts = np.zeros(0, dtype=np.int64)  # counts[i] is bucket offset + i
+        self.offset = 0
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _grow(self, low: int, high: int):
+        """Extend the bucket range to cover keys [low, high]."""
+        if not len(self.counts):
+            self.offset = low
+            self.counts = np.zeros(high - low + 1, dtype=np.int64)
+            return
+        new_low = min(low, self.offset)
+        new_high = max(high, self.offset + len(self.counts) - 1)
+        if new_low == self.offset and new_high == self.offset + len(self.counts) - 1:
+            return
+        counts = np.zeros(new_high - new_low + 1, dtype=np.int64)
+        counts[self.offset - new_low:self.offset - new_low + len(self.counts)] = self.counts
+        self.counts, self.offset = counts, new_low
+
+    def _collapse(self):
+        """Fold the lowest buckets together so at most `max_buckets` remain; high quantiles stay exact."""
+        excess = len(self.counts) - self.max_buckets
+        if excess > 0:
+            self.counts[excess] += self.counts[:excess].sum()
+            self.counts = self.counts[excess:].copy()
+            self.offset += excess
+
+    def add(self, value: float):
+        """Count one sample."""
+        if value != value:  # NaN
+            return
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if value <= MIN_INDEXABLE:
+            self.zero_count += 1
+            return
+        key = math.ceil(math.log(value) / self.log_gamma)
+        if not len(self.counts) or not self.offset <= key < self.offset + len(self.counts):
+            self._grow(key, key)
+        self.counts[key - self.offset] += 1
+        self._collapse()
+
+    def update(self, values: np.ndarray):
+        """Count an array of samples; the same as add() per value, in a few array operations."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.count += len(values)
+        self.sum += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+        positive = values[values > MIN_INDEXABLE]
+        self.zero_count += len(values) - len(positive)
+        if not len(positive):
+            return
+        keys = np.ceil(np.log(positive) / self.log_gamma).astype(np.int64)
+        low, high = int(keys.min()), int(keys.max())
+        self._grow(low, high)
+        self.counts[low - self.offset:high - self.offset + 1] += np.bincount(keys - low, minlength=high - low + 1)
+        self._collapse()
+
+    def merge(self, other: 'QuantileSketch'):
+        """Add the samples counted by `other`, e.g. the sketch of another file or worker."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        if not other.count:
+            return
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.zero_count += other.zero_count
+        if len(other.counts):
+            self._grow(other.offset, other.offset + len(other.counts) - 1)
+            start = other.offset - self.offset
+            self.counts[start:start + len(other.counts)] += other.counts
+            self._collapse()
+
+    def quantiles(self, qs: Sequence[float]) -> np.ndarray:
+        """Values at quantiles `qs` (each in [0, 1]); NaN for an empty sketch."""
+        qs = np.asarray(qs, dtype=np.float64)
+        if not self.count:
+            return np.full(len(qs), np.nan)
+        ranks = qs * (self.count - 1)
+        cumulative = self.zero_count + np.cumsum(self.counts)
+        positions = np.searchsorted(cumulative, ranks, side='right')
+        keys = self.offset + np.minimum(positions, len(self.counts) - 1)
+        # The middle of a bucket, in the relative sense, is within the accuracy of every value in it
+        values = 2 * np.power(self.gamma, keys.astype(np.float64)) / (self.gamma + 1)
+        values = np.where(ranks < self.zero_count, 0.0, values)
+        return np.clip(values, self.min, self.max)
+
+    def quantile(self, q: float) -> float:
+        return float(self.quantiles([q])[0])
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else math.nan
+
+    def to_dict(self) -> Dict[str, Any]:
+        nonzero = np.flatnonzero(self.counts)
+        counts = self.counts[nonzero[0]:nonzero[-1] + 1] if len(nonzero) else self.counts[:0]
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'offset': self.offset + (int(nonzero[0]) if len(nonzero) else 0),
+            'counts': counts.tolist(),
+            'zero_count': self.zero_count,
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any], max_buckets: int = MAX_BUCKETS) -> 'QuantileSketch':
+        sketch = cls(state['relative_accuracy'], max_buckets)
+        sketch.offset = state['offset']
+        sketch.counts = np.asarray(state['counts'], dtype=np.int64)
+        sketch.zero_count = state['zero_count']
+        sketch.count = state['count']
+        sketch.sum = state['sum']
+        if sketch.count:
+            sketch.min, sketch.max = state['min'], state['max']
+        return sketch
+
+class SketchSet:
+    """Quantile sketches keyed by (service, resource)."""
+
+    def __init__(self, sketches: Optional[Dict[Tuple[str, str], QuantileSketch]] = None):
+        self.sketches = sketches or {}
+
+    @classmethod
+    def from_columns(cls, cpu: np.ndarray, memory: np.ndarray, pod_codes: np.ndarray, pod_names: Sequence[str],
+                     key: Callable[[str], str], relative_accuracy: float = RELATIVE_ACCURACY) -> 'SketchSet':
+        """Sketch cpu and memory sample columns, grouped by a key of their pod names.
+
+        `key` runs once per distinct pod name, so a parsed block can be
+        sketched where it is parsed, before any MetricsStore exists.
+        """
+        sketches = cls()
+        if not len(pod_codes):
+            return sketches
+        pod_services = [key(name) for name in pod_names]
+        services = sorted(set(pod_services))
+        codes = {service: code for code, service in enumerate(services)}
+        service_codes = np.array([codes[service] for service in pod_services], dtype=np.int64)[pod_codes]
+        for code, service in enumerate(services):
+            selected = service_codes == code
+            for resource, values in (('cpu', cpu), ('memory', memory)):
+                sketch = QuantileSketch(relative_accuracy)
+                sketch.update(values[selected])
+                if sketch.count:
+                    sketches.sketches[(service, resource)] = sketch
+        return sketches
+
+    @classmethod
+    def from_store(cls, metrics, key: Callable[[str], str],
+                   relative_accuracy: float = RELATIVE_ACCURACY) -> 'SketchSet':
+        """Sketch the cpu and memory samples of a MetricsStore, grouped by a key of the pod name."""
+        return cls.from_columns(metrics.cpu, metrics.memory, metrics.pod_codes, metrics.pod_names,
+                                key, relative_accuracy)
+
+    def sample_count(self, resource: str = 'cpu') -> int:
+        """Number of `resource` samples summarized across all services."""
+        return sum(sketch.count for (_, sketch_resource), sketch in self.sketches.items()
+                   if sketch_resource == resource)
+
+    def get(self, service: str, resource: str) -> Optional[QuantileSketch]:
+        return self.sketches.get((service, resource))
+
+    def services(self) -> Iterable[str]:
+        return sorted({service for service, _ in self.sketches})
+
+    def merge(self, other: 'SketchSet'):
+        for key, sketch in other.sketches.items():
+            if key in self.sketches:
+                self.sketches[key].merge(sketch)
+            else:
+                merged = QuantileSketch(sketch.relative_accuracy, sketch.max_buckets)
+                merged.merge(sketch)
+                self.sketches[key] = merged
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        state: Dict[str, Dict[str, Any]] = {}
+        for (service, resource), sketch in sorted(self.sketches.items()):
+            state.setdefault(service, {})[resource] = sketch.to_dict()
+        return state
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Dict[str, Any]]) -> 'SketchSet':
+        return cls({
+            (service, resource): QuantileSketch.from_dict(sketch)
+            for service, resources in state.items()
+            for resource, sketch in resources.items()
+        })
+
+class SketchHistory:
+    """JSON file of sketch sets, one per metrics source, that outlives the raw captures.
+
+    Recording a source again replaces its previous sketches, so rerunning on
+    the same capture does not count its samples twice; merged() combines
+    every source recorded so far, e.g. several weeks of captures.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        self.sources: Dict[str, Dict[str, Any]] = {}
+        try:
+            with open(path) as f:
+                state = json.load(f)
+            if state.get('version') == SKETCH_VERSION:
+                self.sources = state['sources']
+            else:
+                self.logger.warning("Ignoring sketch history %s written by another version", path)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            self.logger.warning("Ignoring unreadable sketch history %s: %s", path, e)
+
+    def record(self, source: str, sketches: SketchSet):
+        self.sources[source] = {'recorded': time.time(), 'sketches': sketches.to_dict()}
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': SKETCH_VERSION, 'sources': self.sources}, f)
+        os.replace(tmp_path, self.path)
+
+    def merged(self) -> SketchSet:
+        sketches = SketchSet()
+        for source in sorted(self.sources):
+            sketches.merge(SketchSet.from_dict(self.sources[source]['sketches']))
+        return sketches
@@ -1,186 +1,153 @@
-import re
+import numpy as np
 import pandas as pd
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import logging
 from prophet import Prophet
+from recommender_system.forecast_backend import (
+    BUFFER, FORECAST_FREQ, FORECAST_PERIODS, INTERVAL_WIDTH, build_recommendation, format_recommendation, to_series
+)
+from recommender_system.forecast_cache import ForecastCache
 
-class ResourceParser:
-    def __init__(self):
-        self.memory_units = {
-            'Ki': 1/1024,      # Convert to Mi
-            'Mi': 1,           # Base unit
-            'Gi': 1024,        # Convert to Mi
-            'Ti': 1024*1024    # Convert to Mi
-        }
-        self.cpu_units = {
-            'm': 1,            # Base unit (millicores)
-            '': 1000           # Convert cores to millicores
-        }
-
-    def _parse_kubernetes_memory(self, value: str) -> float:
-        """Convert memory values to Mi"""
-        try:
-            if isinstance(value, (int, float)):
-                return float(value)
-            
-            if not isinstance(value, str):
-                return 0.0
-
-            match = re.match(r'^(\d+\.?\d*)([KMGT]i)?$', value)
-            if match:
-                number = float(match.group(1))
-                unit = match.group(2) or ''
-                return number * self.memory_units.get(unit, 1)
-            return 0.0
-        except (ValueError, TypeError):
-            self.logger.warning(f"Could not parse memory value: {value}")
-            return 0.0
-
-    def parse_cpu(self, value: str) -> float:
-        """Convert CPU values to millicores (m)"""
-        try:
-            if isinstance(value, (int, float)):
-                return float(value) * 1000  # Convert cores to millicores
-            
-            if isinstance(value, str):
-                if value.endswith('m'):
-                    return float(value.rstrip('m'))
-                return float(value) * 1000  # Convert cores to millicores
-            return 0.0
-        except (ValueError, TypeError):
-            self.logger.warning(f"Could not parse CPU value: {value}")
-            return 0.0
-
-    def _preprocess_metrics(self, df: pd.DataFrame, resource_type: str) -> pd.DataFrame:
-        """Preprocess metrics DataFrame for Prophet model with standardized units."""
-        df_copy = df.copy()
-        
-        if resource_type == 'cpu':
-            df_copy['y'] = df_copy['y'].apply(self.parse_cpu)  # Convert to millicores
-        elif resource_type == 'memory':
-            df_copy['y'] = df_copy['y'].apply(self._parse_kubernetes_memory)  # Convert to Mi
-            
-        return df_copy
+PROPHET_PARAMS = {
+    'growth': 'linear',                     # Use a simple linear trend
+    # 'n_changepoints': 5,                  # Reduce the number of changepoints
+    # 'changepoint_range': 1.0,             # Use the entire dataset for changepoints
+    'yearly_seasonality': False,            # Disable yearly seasonality
+    'weekly_seasonality': False,            # Disable weekly seasonality
+    'daily_seasonality': False,             # Disable daily seasonality
+    'seasonality_mode': 'additive',         # Additive seasonality for small datasets
+    'seasonality_prior_scale': 5,           # Reduce flexibility to prevent overfitting
+    'interval_width': INTERVAL_WIDTH,       # Narrower confidence intervals
+    'uncertainty_samples': 10,              # Reduce uncertainty sampling
+}
+SEASONALITIES = [{'name': 'hourly', 'period': 60, 'fourier_order': 3}]
+# Prophet's MAP parameters; scalars are k, m and sigma_obs, vectors are delta and beta
+WARM_START_SCALARS = ('k', 'm', 'sigma_obs')
+WARM_START_VECTORS = ('delta', 'beta')
 
 class ResourceRecommenderProphet:
-    def __init__(self):
-        self.logger = logging.getLogger(__name__)
-        self.memory_units = {
-            'Ki': 1024,
-            'Mi': 1024**2, 
-            'Gi': 1024**3,
-            'Ti': 1024**4
-        }
+    """Prophet forecasting backend."""
+    name = 'prophet'
 
-    def _parse_kubernetes_cpu(self, value: str) -> float:
-        """Convert Kubernetes CPU value (e.g. '393m') to float."""
-        try:
-            if isinstance(value, (int, float)):
-                return float(value)
-            if isinstance(value, str):
-                if value.endswith('m'):
-                    return float(value.rstrip('m'))
-                return float(value)
-            return 0.0
-        except (ValueError, TypeError):
-            self.logger.warning(f"Could not parse CPU value: {value}")
-            return 0.0
-
-    def _parse_kubernetes_memory(self, value: str) -> float:
-        try:
-            if isinstance(value, (int, float)):
-                return float(value)
-            
-            if not isinstance(value, str):
-                return 0.0
-
-            match = re.match(r'^(\d+\.?\d*)([KMGT]i)?$', value)
-            if match:
-                number = float(match.group(1))
-                unit = match.group(2) or ''
-                return number * self.memory_units.get(unit, 1)
-            return 0.0
-        except (ValueError, TypeError):
-            self.logger.warning(f"Could not parse memory value: {value}")
-            return 0.0
+    def __init__(self, cache: Optional[ForecastCache] = None, warm_start: bool = False):
+        self.logger = logging.getLogger(__name__)
+        self.cache = cache
+        # Refits seed the optimizer with the series' previous parameters (needs the cache to keep them)
+        self.warm_start = warm_start
 
     def _preprocess_metrics(self, df: pd.DataFrame, resource_type: str) -> pd.DataFrame:
         """Preprocess metrics DataFrame for Prophet model."""
-        df_copy = df.copy()
-        
-        if resource_type == 'cpu':
-            df_copy[resource_type] = df_copy[resource_type].apply(self._parse_kubernetes_cpu)
-        elif resource_type == 'memory':
-            df_copy[resource_type] = df_copy[resource_type].apply(self._parse_kubernetes_memory)
-        
-        return df_copy.reset_index().rename(
-            columns={'timestamp': 'ds', resource_type: 'y'}
-        )
+        return to_series(df, resource_type)
 
     def _format_recommendation(self, value: float, resource_type: str) -> Dict[str, Any]:
         """Format recommendation with proper units and ranges."""
-        if resource_type == 'cpu':
-            # Floor at 0 and convert to millicores
-            cpu_cores = max(0, value)
-            return {
-                'raw_value': cpu_cores,
-                'formatted': f"{int(cpu_cores * 1000)}m",
-                'unit': 'millicores'
-            }
-        else:  # memory
-            # Convert bytes to Mi and floor at 0
-            memory_mi = max(0, value / (1024 * 1024))
-            return {
-                'raw_value': memory_mi,
-                'formatted': f"{int(memory_mi)}Mi",
-                'unit': 'Mi'
-            }
-
-    def generate_recommendation(self, metrics_df: pd.DataFrame, resource_type: str = 'cpu') -> Dict[str, Any]:
+        return format_recommendation(value, resource_type)
+
+    def _model_config(self, resource_type: str) -> Dict[str, Any]:
+        """Everything besides the input series that determines a recommendation."""
+        return {
+            'resource': resource_type,
+            'prophet': PROPHET_PARAMS,
+            'seasonalities': SEASONALITIES,
+            'periods': FORECAST_PERIODS,
+            'freq': FORECAST_FREQ,
+            'buffer': BUFFER
+        }
+
+    def _new_model(self) -> Prophet:
+        model = Prophet(**PROPHET_PARAMS)
+        for seasonality in SEASONALITIES:
+            model.add_seasonality(**seasonality)
+        return model
+
+    @staticmethod
+    def _stan_init(model: Prophet) -> Dict[str, Any]:
+        """Fitted parameters of `model` in the form Prophet.fit(init=...) accepts."""
+        init = {name: float(model.params[name][0][0]) for name in WARM_START_SCALARS}
+        init.update({name: np.asarray(model.params[name][0], dtype=float).tolist() for name in WARM_START_VECTORS})
+        return init
+
+    @staticmethod
+    def _init_fits(init: Dict[str, Any], n_rows: int) -> bool:
+        """Whether `init` has the parameter shapes a model fitted on `n_rows` rows will have.
+
+        Mirrors Prophet's rules: one delta per changepoint, with fewer
+        changepoints on short histories, and two beta terms per Fourier order.
+        """
+        n_changepoints = PROPHET_PARAMS.get('n_changepoints', 25)
+        hist_size = int(np.floor(n_rows * PROPHET_PARAMS.get('changepoint_range', 0.8)))
+        if n_changepoints + 1 > hist_size:
+            n_changepoints = max(hist_size - 1, 0)
+        n_beta = sum(2 * seasonality['fourier_order'] for seasonality in SEASONALITIES)
+        return (all(name in init for name in WARM_START_SCALARS)
+                and len(init.get('delta', ())) == max(n_changepoints, 1)
+                and len(init.get('beta', ())) == n_beta)
+
+    def fit(self, processed_df: pd.DataFrame, resource_type: str, series_id: Optional[str] = None) -> Prophet:
+        """Fit a model, warm started from the series' previous parameters when they fit the new data."""
+        config = self._model_config(resource_type)
+        init = None
+        if self.warm_start and self.cache and series_id:
+            init = self.cache.load_params(series_id, config)
+            if init is not None and not self._init_fits(init, processed_df['y'].notna().sum()):
+                self.logger.info("Previous parameters of %s do not match the new data; fitting cold", series_id)
+                init = None
+            elif init is not None:
+                # The cache stores vectors as lists; Prophet checks their shape against its own inits
+                init.update({name: np.asarray(init[name], dtype=float) for name in WARM_START_VECTORS})
+
+        model = self._new_model()
+        if init is not None:
+            try:
+                model.fit(processed_df, init=init)
+            except Exception as e:
+                self.logger.warning("Warm start for %s failed (%s); fitting cold", series_id, e)
+                # A Prophet model can only be fitted once
+                model = self._new_model()
+                model.fit(processed_df)
+        else:
+            model.fit(processed_df)
+
+        if self.cache and series_id:
+            self.cache.save_params(series_id, config, self._stan_init(model))
+        return model
+
+    def predict(self, model: Prophet, periods: int = FORECAST_PERIODS, freq: str = FORECAST_FREQ) -> pd.DataFrame:
+        return model.predict(model.make_future_dataframe(periods=periods, freq=freq))
+
+    def generate_recommendation(self, metrics_df: pd.DataFrame, resource_type: str = 'cpu',
+                                series_id: Optional[str] = None) -> Dict[str, Any]:
+        """Forecast a resource and recommend a request for it.
+
+        `series_id` names the series across runs (e.g. the service) so its
+        fitted parameters can seed the next fit when warm starting.
+        """
         try:
             processed_df = self._preprocess_metrics(metrics_df, resource_type)
             current_usage = processed_df['y'].mean()
+            config = self._model_config(resource_type)
+
+            # An unchanged series with an unchanged configuration reuses the stored result
+            key = self.cache.key(processed_df, config) if self.cache else None
+            if key:
+                entry = self.cache.load(key)
+                if entry is not None:
+                    self.logger.info("Reusing cached %s forecast %s", resource_type, key)
+                    return entry['result']
             
             # Get forecast
-            model = Prophet(
-                growth='linear',                     # Use a simple linear trend
-                # n_changepoints=5,                    # Reduce the number of changepoints
-                # changepoint_range=1.0,               # Use the entire dataset for changepoints
-                yearly_seasonality=False,            # Disable yearly seasonality
-                weekly_seasonality=False,            # Disable weekly seasonality
-                daily_seasonality=False,             # Disable daily seasonality
-                seasonality_mode='additive',         # Additive seasonality for small datasets
-                seasonality_prior_scale=5,           # Reduce flexibility to prevent overfitting
-                interval_width=0.6,                  # Narrower confidence intervals
-                uncertainty_samples=10,             # Reduce uncertainty sampling
+            model = self.fit(processed_df, resource_type, series_id)
+            forecast = self.predict(model)
+            result = build_recommendation(
+                forecast,
+                current_usage,
+                resource_type,
+                daily_pattern=bool(model.daily_seasonality),
+                weekly_pattern=bool(model.weekly_seasonality)
             )
-
-            model.add_seasonality(name='hourly', period=60, fourier_order=3)
-            
-            model.fit(processed_df)
-            future = model.make_future_dataframe(periods=7, freq='T')
-            forecast = model.predict(future)
-            
-            # Calculate recommendation
-            peak_forecast = max(0, forecast['yhat_upper'].max())
-            recommendation = peak_forecast * 1.2  # 20% buffer
-            
-            formatted_rec = self._format_recommendation(recommendation, resource_type)
-            formatted_current = self._format_recommendation(current_usage, resource_type)
-            
-            return {
-                'current_usage': formatted_current,
-                'recommendation': formatted_rec,
-                'forecast': forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].to_dict('records'),
-                'factors': {
-                    'trend': forecast['trend'].mean(),
-                    'daily_pattern': bool(model.daily_seasonality),
-                    'weekly_pattern': bool(model.weekly_seasonality),
-                    'buffer': 1.2
-                }
-            }
+            if key:
+                self.cache.save(key, result)
+            return result
         except Exception as e:
-            self.logger.error(f"Failed to generate recommendation: {str(e)}")
+            self.logger.error("Failed to generate recommendation: %s", e)
             raise
-
-
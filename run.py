@@ -1,13 +1,20 @@
 import argparse
 import os
+from common.data_reader import expand_paths
 from metric_analyzer.kubernetes_monitor import KubernetesMonitor
+from metric_analyzer.resampling import parse_aggregate, parse_bucket
+from recommender_system.forecast_backend import BACKENDS
+
+def paths_exist(spec) -> bool:
+    paths = expand_paths(spec)
+    return bool(paths) and all(os.path.exists(path) for path in paths)
 
 def get_interactive_input():
     while True:
-        metrics_file = input("Enter path to metrics file: ").strip()
-        restarts_file = input("Enter path to restarts file: ").strip()
+        metrics_file = input("Enter path, directory or glob of metrics files: ").strip()
+        restarts_file = input("Enter path, directory or glob of restarts files: ").strip()
         
-        if os.path.exists(metrics_file) and os.path.exists(restarts_file):
+        if paths_exist(metrics_file) and paths_exist(restarts_file):
             return metrics_file, restarts_file
         
         print("\nError: One or both files not found. Please try again.\n")
@@ -19,23 +26,111 @@ def parse_arguments():
     parser.add_argument(
         '--metrics-file',
         type=str,
+        nargs='+',
         required=False,
-        help='Path to the metrics file containing pod performance data'
+        help='Metrics files containing pod performance data (paths, directories or globs)'
     )
     parser.add_argument(
         '--restarts-file',
         type=str,
+        nargs='+',
         required=False,
-        help='Path to the file containing pod restart information'
+        help='Files containing pod restart information (paths, directories or globs)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Number of processes used to parse the metrics file'
+    )
+    parser.add_argument(
+        '--forecast-workers',
+        type=int,
+        default=1,
+        help='Number of processes used to fit the per-service forecasts'
+    )
+    parser.add_argument(
+        '--warm-start',
+        action='store_true',
+        help="Start each service's refit from its previous fitted parameters"
+    )
+    parser.add_argument(
+        '--forecast-backend',
+        choices=BACKENDS,
+        default='prophet',
+        help="Forecasting engine: Prophet, the NumPy Holt smoother, 'auto' to pick by series length, "
+             "'percentile' for P95 usage plus headroom, or 'batched' to fit all series in one regression"
+    )
+    parser.add_argument(
+        '--resample-bucket',
+        type=parse_bucket,
+        help="Combine replica samples into one series with this bucket size (e.g. '1min', '5min') before forecasting"
+    )
+    parser.add_argument(
+        '--resample-aggregate',
+        type=parse_aggregate,
+        default='mean',
+        help='How replicas are combined per bucket: sum, mean, max or a percentile such as p95'
+    )
+    parser.add_argument(
+        '--no-per-pod',
+        action='store_true',
+        help='Aggregate raw samples per bucket instead of first averaging each pod within the bucket'
+    )
+    parser.add_argument(
+        '--all-services',
+        action='store_true',
+        help='Recommend resources for every service in the metrics, not only the problematic ones'
+    )
+    parser.add_argument(
+        '--sketch-file',
+        type=str,
+        help='JSON file that accumulates per-service usage sketches across captures for percentile recommendations'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        type=str,
+        default='cache',
+        help='Directory for cached parsed input files'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Always reparse the input files instead of using the cache'
+    )
+    parser.add_argument(
+        '--follow',
+        action='store_true',
+        help='Only parse metrics appended since the last run of a growing capture file'
+    )
+    parser.add_argument(
+        '--history-db',
+        type=str,
+        help='SQLite database that accumulates restart snapshots across runs'
+    )
+    parser.add_argument(
+        '--min-restarts',
+        type=int,
+        default=1,
+        help='Minimum restarts for a service to appear in the restart history report'
+    )
+    parser.add_argument(
+        '--restart-window-hours',
+        type=float,
+        default=24,
+        help='Time window of the restart history report in hours'
+    )
+    parser.add_argument(
+        '--quarantine-file',
+        type=str,
+        help='File that receives unparsable input lines with their line number and reason'
     )
     return parser.parse_args()
 
-def get_file_paths():
-    args = parse_arguments()
-    
+def get_file_paths(args):
     # If both arguments provided via CLI, validate and use them
     if args.metrics_file and args.restarts_file:
-        if os.path.exists(args.metrics_file) and os.path.exists(args.restarts_file):
+        if paths_exist(args.metrics_file) and paths_exist(args.restarts_file):
             return args.metrics_file, args.restarts_file
     
     # Fall back to interactive input
@@ -47,6 +142,10 @@ def print_resource_recommendation(resource_type: str, metrics: dict):
     print("  Factors:")
     for factor, value in metrics['factors'].items():
         print(f"    - {factor}: {value:.2f}")
+    if 'percentiles' in metrics:
+        print("  Usage percentiles:")
+        for percentile, value in metrics['percentiles'].items():
+            print(f"    - {percentile}: {value}")
     print("  Forecast:")
     print("    - Next 24h prediction range:")
     forecast = metrics['forecast']
@@ -55,11 +154,33 @@ def print_resource_recommendation(resource_type: str, metrics: dict):
         print(f"      Min: {latest['yhat_lower']:.0f}")
         print(f"      Max: {latest['yhat_upper']:.0f}")
 
+def print_restart_history(monitor: KubernetesMonitor, min_restarts: int, window_hours: float):
+    services = monitor.history.services_with_restarts(min_restarts, window_hours)
+    print(f"\nServices with at least {min_restarts} restarts in the past {window_hours:g}h:")
+    if not services:
+        print("  None")
+    for service, restarts in services.items():
+        print(f"- {service}: {restarts} restarts")
+
 def main():
-    metrics_file, restarts_file = get_file_paths()
+    args = parse_arguments()
+    metrics_file, restarts_file = get_file_paths(args)
     monitor = KubernetesMonitor(
         metrics_file=metrics_file,
-        restarts_file=restarts_file
+        restarts_file=restarts_file,
+        ingest_workers=args.workers,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        follow=args.follow,
+        history_db=args.history_db,
+        quarantine_file=args.quarantine_file,
+        forecast_workers=args.forecast_workers,
+        warm_start=args.warm_start,
+        forecast_backend=args.forecast_backend,
+        sketch_file=args.sketch_file,
+        all_services=args.all_services,
+        resample_bucket=args.resample_bucket,
+        resample_aggregate=args.resample_aggregate,
+        per_pod=not args.no_per_pod
     )
     problematic_services, recommendations = monitor.run_analysis()
     
@@ -75,10 +196,27 @@ def main():
         print("======================")
         for service, rec in recommendations.items():
             print(f"\nService: {service}")
+            if not rec:
+                print("  No recommendation available")
+                continue
             print_resource_recommendation('cpu', rec['metrics']['cpu'])
             print_resource_recommendation('memory', rec['metrics']['memory'])
     else:
         print("No problematic services found.")
 
+    quarantined = monitor.quarantine.summary()
+    if quarantined:
+        print("\nQuarantined Input Lines")
+        print("=======================")
+        for reason, count in sorted(quarantined.items()):
+            print(f"- {reason}: {count}")
+        if args.quarantine_file:
+            print(f"Written to {args.quarantine_file}")
+
+    if monitor.history:
+        print("\nRestart History")
+        print("===============")
+        print_restart_history(monitor, args.min_restarts, args.restart_window_hours)
+
 if __name__ == "__main__":
     main()
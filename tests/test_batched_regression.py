@@ -0,0 +1,65 @@
+import unittest
+import numpy as np
+import pandas as pd
+from recommender_system.batched_regression import BatchedFourierRecommender
+
+MINUTES = 4 * 60
+
+def usage_frame(level: float, slope: float, amplitude: float, seed: int) -> pd.DataFrame:
+    """Per-minute samples with a trend, an hourly cycle and noise, indexed by timestamp."""
+    steps = np.arange(MINUTES)
+    values = level + slope * steps + amplitude * np.sin(2 * np.pi * steps / 60)
+    values += np.random.default_rng(seed).normal(0, 5, MINUTES)
+    index = pd.date_range('2026-10-15', periods=MINUTES, freq='1min', name='timestamp')
+    return pd.DataFrame({'cpu': values}, index=index)
+
+def series(metrics_df: pd.DataFrame) -> pd.DataFrame:
+    return metrics_df.reset_index().rename(columns={'timestamp': 'ds', 'cpu': 'y'})
+
+class BatchedFourierRecommenderTest(unittest.TestCase):
+    def setUp(self):
+        self.batched = BatchedFourierRecommender()
+        self.metrics = [usage_frame(400, 0.5, 50, 0), usage_frame(100, 0.0, 10, 1), usage_frame(900, -1.0, 80, 2)]
+
+    def test_batch_fit_matches_fitting_each_series(self):
+        model = self.batched.fit_batch([series(frame) for frame in self.metrics])
+        for column, frame in enumerate(self.metrics):
+            with self.subTest(column=column):
+                single = self.batched.fit(series(frame))
+                np.testing.assert_allclose(model.coefficients[:, column], single.coefficients[:, 0])
+                np.testing.assert_allclose([model.lower[column], model.upper[column]], [single.lower[0], single.upper[0]])
+
+    def test_batch_recommendations_match_single_ones(self):
+        recommendations = self.batched.generate_recommendations(self.metrics, ['cpu'] * len(self.metrics))
+        for frame, recommendation in zip(self.metrics, recommendations):
+            single = self.batched.generate_recommendation(frame, 'cpu')
+            self.assertAlmostEqual(recommendation['recommendation']['raw_value'], single['recommendation']['raw_value'])
+            self.assertEqual(len(recommendation['forecast']), 7)
+
+    def test_series_recovers_its_trend_and_cycle(self):
+        forecast = self.batched.predict(self.batched.fit(series(self.metrics[0])), periods=60)
+        future = forecast.tail(60)
+        steps = np.arange(MINUTES, MINUTES + 60)
+        expected = 400 + 0.5 * steps + 50 * np.sin(2 * np.pi * steps / 60)
+        np.testing.assert_allclose(future['yhat'], expected, atol=5)
+
+    def test_forecast_starts_at_the_series_first_sample(self):
+        late = self.metrics[1].iloc[60:]
+        model = self.batched.fit_batch([series(self.metrics[0]), series(late)])
+        ds, yhat, trend = self.batched.predict_batch(model)
+        frame = self.batched._forecast_frame(model, ds, yhat, trend, 1)
+        self.assertEqual(frame['ds'].iloc[0], late.index[0])
+        self.assertEqual(len(frame), MINUTES - 60 + 7)
+
+    def test_other_frequency_is_rejected(self):
+        model = self.batched.fit(series(self.metrics[0]))
+        with self.assertRaises(ValueError):
+            self.batched.predict(model, freq='5min')
+
+    def test_series_without_samples_is_rejected(self):
+        empty = series(self.metrics[1]).assign(y=np.nan)
+        with self.assertRaises(ValueError):
+            self.batched.fit_batch([series(self.metrics[0]), empty])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import gzip
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from common.data_reader import DataReader, capture_start_date, merge_by_time
+
+class DataReaderTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.dir = directory.name
+
+    def write_lines(self, name: str, lines) -> str:
+        path = os.path.join(self.dir, name)
+        with open(path, 'w') as f:
+            f.writelines(line + '\n' for line in lines)
+        return path
+
+    def test_blocks_end_on_line_boundaries(self):
+        lines = [f'[10:00:{s:02d}] web-1 {s}m 1Mi' for s in range(60)]
+        path = self.write_lines('metrics.txt', lines)
+        blocks = list(DataReader(path, path).read_performance_blocks(block_size=100))
+        self.assertGreater(len(blocks), 1)
+        self.assertTrue(all(block.endswith('\n') for block in blocks))
+        self.assertEqual(''.join(blocks).splitlines(), lines)
+
+    def test_lines_are_read_lazily(self):
+        path = self.write_lines('metrics.txt', ['[10:00:00] web-1 1m 1Mi', '[10:00:01] web-1 2m 1Mi'])
+        lines = DataReader(path, path).read_performance_data()
+        self.assertEqual(next(lines), '[10:00:00] web-1 1m 1Mi\n')
+        # Lines written after the first one was read are still picked up, as the file is read as it goes
+        with open(path, 'a') as f:
+            f.write('[10:00:02] web-1 3m 1Mi\n')
+        self.assertEqual(len(list(lines)), 2)
+
+    def test_missing_file_yields_nothing(self):
+        missing = os.path.join(self.dir, 'missing.txt')
+        self.assertEqual(list(DataReader(missing, missing).read_performance_blocks()), [])
+
+class MergeByTimeTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.dir = directory.name
+
+    def write(self, name: str, lines, modified: datetime, compress: bool = False) -> str:
+        path = os.path.join(self.dir, name)
+        data = ''.join(line + '\n' for line in lines).encode()
+        with open(path, 'wb') as f:
+            f.write(gzip.compress(data) if compress else data)
+        os.utime(path, (modified.timestamp(), modified.timestamp()))
+        return path
+
+    def test_rotated_files_are_merged_in_time_order(self):
+        # Rotated across midnight; the files are listed newest first
+        newer = self.write('metrics.1', ['[00:00:01] web-1 1m 1Mi', '[00:00:03] web-1 3m 1Mi'],
+                           datetime(2026, 10, 16, 0, 5), compress=True)
+        older = self.write('metrics.0', ['[23:59:58] web-1 0m 1Mi', '[23:59:59] web-1 0m 1Mi'],
+                           datetime(2026, 10, 16, 0, 0, 30))
+        merged = [line.split()[0] for line in merge_by_time([newer, older])]
+        self.assertEqual(merged, ['[23:59:58]', '[23:59:59]', '[00:00:01]', '[00:00:03]'])
+        self.assertEqual(capture_start_date([newer, older]), '2026-10-15')
+
+    def test_multi_day_capture_starts_on_its_first_day(self):
+        # Oct 13 18:00 to Oct 15 11:00, last written Oct 15 12:00
+        clocks = ['18:00:00', '00:00:00', '06:00:00', '12:30:00', '18:00:00', '00:00:00', '06:00:00', '11:00:00']
+        capture = self.write('capture.txt', [f'[{clock}] web-1 1m 1Mi' for clock in clocks],
+                             datetime(2026, 10, 15, 12, 0))
+        hourly = self.write('hourly.txt', ['[12:00:00] api-1 1m 1Mi', '[12:59:00] api-1 1m 1Mi'],
+                            datetime(2026, 10, 14, 13, 0))
+        self.assertEqual(capture_start_date([capture]), '2026-10-13')
+        self.assertEqual(capture_start_date([hourly, capture]), '2026-10-13')
+
+        merged = [' '.join(line.split()[:2]) for line in merge_by_time([hourly, capture])]
+        self.assertEqual(merged, [
+            '[18:00:00] web-1', '[00:00:00] web-1', '[06:00:00] web-1',
+            '[12:00:00] api-1', '[12:30:00] web-1', '[12:59:00] api-1',
+            '[18:00:00] web-1', '[00:00:00] web-1', '[06:00:00] web-1', '[11:00:00] web-1'
+        ])
+
+    def test_overlapping_files_interleave(self):
+        modified = datetime(2026, 10, 15, 12, 0)
+        first = self.write('a.txt', ['[10:00:00] a-1 1m 1Mi', 'NAME CPU MEMORY', '[10:00:02] a-1 1m 1Mi',
+                                     '[10:00:04] a-1 1m 1Mi'], modified)
+        second = self.write('b.txt', ['[10:00:01] b-1 1m 1Mi', '[10:00:02] b-1 1m 1Mi', '[10:00:03] b-1 1m 1Mi'],
+                            modified)
+        merged = [line.rstrip('\n') for line in merge_by_time([first, second])]
+        self.assertEqual(merged, [
+            '[10:00:00] a-1 1m 1Mi',
+            'NAME CPU MEMORY',  # lines without a time keep the position of the line before them
+            '[10:00:01] b-1 1m 1Mi',
+            '[10:00:02] a-1 1m 1Mi',  # ties go to the file listed first
+            '[10:00:02] b-1 1m 1Mi',
+            '[10:00:03] b-1 1m 1Mi',
+            '[10:00:04] a-1 1m 1Mi'
+        ])
+
+    def test_reader_merges_blocks_of_several_files(self):
+        modified = datetime(2026, 10, 15, 12, 0)
+        self.write('b.txt', [f'[10:00:{s:02d}] b-1 1m 1Mi' for s in range(1, 60, 2)], modified)
+        self.write('a.txt', [f'[10:00:{s:02d}] a-1 1m 1Mi' for s in range(0, 60, 2)], modified)
+        blocks = list(DataReader(self.dir, []).read_performance_blocks(block_size=100))
+        self.assertGreater(len(blocks), 1)
+        self.assertTrue(all(block.endswith('\n') for block in blocks))
+        times = [line.split()[0] for line in ''.join(blocks).splitlines()]
+        self.assertEqual(times, [f'[10:00:{s:02d}]' for s in range(60)])
+
+if __name__ == '__main__':
+    unittest.main()
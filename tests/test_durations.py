@@ -0,0 +1,32 @@
+import math
+import unittest
+import numpy as np
+from metric_analyzer.durations import duration_seconds, durations_seconds
+
+class DurationTest(unittest.TestCase):
+    def test_kubectl_durations(self):
+        cases = {
+            '45s': 45,
+            '5m30s': 330,
+            '3d4h': 3 * 86400 + 4 * 3600,
+            '2y': 2 * 365 * 86400,
+            '1.5h': 5400,
+            '(25m3s ago)': 25 * 60 + 3,
+            '10m ago': 600,
+            ' 7d ': 7 * 86400
+        }
+        for value, expected in cases.items():
+            with self.subTest(value=value):
+                self.assertEqual(duration_seconds(value), expected)
+
+    def test_invalid_durations_are_nan(self):
+        for value in ('<invalid>', '', '5', 'm5', '5x', '3d-4h', 'ago'):
+            with self.subTest(value=value):
+                self.assertTrue(math.isnan(duration_seconds(value)))
+
+    def test_column_conversion(self):
+        converted = durations_seconds(['5m', None, '5m', 'bad', '1h'])
+        np.testing.assert_array_equal(converted, [300, np.nan, 300, np.nan, 3600])
+
+if __name__ == '__main__':
+    unittest.main()
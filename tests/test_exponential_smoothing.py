@@ -0,0 +1,69 @@
+import unittest
+import numpy as np
+import pandas as pd
+from recommender_system.exponential_smoothing import HoltRecommender
+
+def replica_frame(values: np.ndarray, replicas: int = 3, seed: int = 0) -> pd.DataFrame:
+    """Per-minute cpu samples of several replicas around `values`, indexed by timestamp."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2026-10-15', periods=len(values), freq='1min', name='timestamp')
+    frames = [pd.DataFrame({'cpu': values + rng.normal(0, 20, len(values))}, index=index) for _ in range(replicas)]
+    return pd.concat(frames).sort_index()
+
+def series(metrics_df: pd.DataFrame) -> pd.DataFrame:
+    return metrics_df.reset_index().rename(columns={'timestamp': 'ds', 'cpu': 'y'})
+
+class HoltRecommenderTest(unittest.TestCase):
+    def setUp(self):
+        self.holt = HoltRecommender()
+
+    def test_flat_noisy_series_forecasts_its_level(self):
+        metrics = replica_frame(np.full(6 * 60, 400.0))
+        forecast = self.holt.predict(self.holt.fit(series(metrics)))
+        future = forecast.tail(7)
+        np.testing.assert_allclose(future['yhat'], 400, atol=10)
+        self.assertLess(np.ptp(future['yhat']), 1)
+
+        recommendation = self.holt.generate_recommendation(metrics, 'cpu')
+        self.assertAlmostEqual(recommendation['current_usage']['raw_value'], metrics['cpu'].mean())
+        self.assertAlmostEqual(recommendation['recommendation']['raw_value'], forecast['yhat_upper'].max() * 1.2)
+        self.assertLess(recommendation['recommendation']['raw_value'], 1.2 * 460)
+
+    def test_one_step_per_minute_however_many_replicas(self):
+        model = self.holt.fit(series(replica_frame(np.full(60, 400.0), replicas=5)))
+        self.assertEqual(len(model.ds), 60)
+        self.assertTrue((np.diff(model.ds) == np.timedelta64(60, 's')).all())
+
+    def test_trend_is_followed_and_damped(self):
+        model = self.holt.fit(series(replica_frame(100 + 2.0 * np.arange(6 * 60))))
+        # The damped trend is a cautious estimate of the slope of 2, so the level lags a few steps behind
+        self.assertAlmostEqual(model.last_level, 100 + 2.0 * 359, delta=25)
+        self.assertGreater(model.last_trend, 0)
+        future = self.holt.predict(model, periods=30).tail(30)['yhat'].to_numpy()
+        increments = np.diff(np.concatenate([[model.last_level], future]))
+        self.assertTrue((increments > 0).all())
+        self.assertTrue((np.diff(increments) < 0).all())
+        # Damping caps the trend's contribution at phi / (1 - phi) steps
+        self.assertLess(future[-1] - model.last_level, model.last_trend * 9 + 1e-9)
+
+    def test_gap_steps_follow_the_forecast(self):
+        metrics = replica_frame(np.full(3 * 60, 400.0))
+        minutes = (metrics.index - metrics.index[0]) // pd.Timedelta('1min')
+        model = self.holt.fit(series(metrics[(minutes < 60) | (minutes >= 90)]))
+        self.assertEqual(len(model.ds), 3 * 60)
+        np.testing.assert_allclose(model.level[60:90], model.level[59], atol=1)
+        self.assertTrue(np.isfinite(model.fitted).all())
+
+    def test_interval_widens_over_the_horizon(self):
+        model = self.holt.fit(series(replica_frame(np.full(6 * 60, 400.0))))
+        future = self.holt.predict(model, periods=10).tail(10)
+        width = (future['yhat_upper'] - future['yhat_lower']).to_numpy()
+        self.assertAlmostEqual(width[0], model.upper - model.lower)
+        self.assertTrue((np.diff(width) > 0).all())
+
+    def test_empty_series_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.holt.fit(pd.DataFrame({'ds': pd.to_datetime([]), 'y': np.array([], dtype=float)}))
+
+if __name__ == '__main__':
+    unittest.main()
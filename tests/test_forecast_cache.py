@@ -0,0 +1,79 @@
+import importlib.util
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+from recommender_system.forecast_cache import ForecastCache
+
+HAS_PROPHET = importlib.util.find_spec('prophet') is not None
+CONFIG = {'interval_width': 0.95, 'daily_seasonality': False}
+
+def series(values: list) -> pd.DataFrame:
+    return pd.DataFrame({'ds': pd.date_range('2026-10-15', periods=len(values), freq='1min'), 'y': values})
+
+def usage_frame(seed: int) -> pd.DataFrame:
+    """Three hours of per-minute cpu samples indexed by timestamp."""
+    cpu = 400 + np.random.default_rng(seed).normal(0, 10, 180)
+    return pd.DataFrame({'cpu': cpu}, index=pd.date_range('2026-10-15', periods=180, freq='1min', name='timestamp'))
+
+class ForecastCacheTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.dir = directory.name
+        self.cache = ForecastCache(self.dir, max_entries=2)
+
+    def test_key_depends_on_series_and_config(self):
+        key = ForecastCache.key(series([1.0, 2.0, 3.0]), CONFIG)
+        self.assertEqual(ForecastCache.key(series([1.0, 2.0, 3.0]), dict(reversed(CONFIG.items()))), key)
+        self.assertNotEqual(ForecastCache.key(series([1.0, 2.0, 4.0]), CONFIG), key)
+        self.assertNotEqual(ForecastCache.key(series([1.0, 2.0, 3.0]), {**CONFIG, 'daily_seasonality': True}), key)
+
+    def test_hit_returns_the_stored_result(self):
+        result = {'recommended': 420.5, 'peak_time': pd.Timestamp('2026-10-16 09:00'), 'samples': np.int64(3)}
+        self.cache.save('a', result)
+        self.assertEqual(self.cache.load('a'), {'version': 2, 'result': result})
+        self.assertIsNone(self.cache.load('missing'))
+
+    def test_unreadable_or_outdated_entries_miss(self):
+        with open(os.path.join(self.dir, 'old.json'), 'w') as f:
+            json.dump({'version': 1, 'result': {}}, f)
+        with open(os.path.join(self.dir, 'torn.json'), 'w') as f:
+            f.write('{"version": 2, "res')
+        self.assertIsNone(self.cache.load('old'))
+        self.assertIsNone(self.cache.load('torn'))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        for i, key in enumerate(('a', 'b')):
+            self.cache.save(key, {'value': i})
+            os.utime(os.path.join(self.dir, f"{key}.json"), ns=(i * 10**9, i * 10**9))
+        # Loading "a" makes "b" the least recently used entry
+        self.assertIsNotNone(self.cache.load('a'))
+        self.cache.save('c', {'value': 2})
+        self.assertIsNone(self.cache.load('b'))
+        self.assertEqual(self.cache.load('a')['result'], {'value': 0})
+        self.assertEqual(self.cache.load('c')['result'], {'value': 2})
+
+    def test_params_are_kept_per_series_and_config(self):
+        self.cache.save_params('api', CONFIG, {'k': [0.5]})
+        self.assertEqual(self.cache.load_params('api', CONFIG), {'k': [0.5]})
+        self.assertIsNone(self.cache.load_params('web', CONFIG))
+        self.assertIsNone(self.cache.load_params('api', {**CONFIG, 'daily_seasonality': True}))
+
+@unittest.skipUnless(HAS_PROPHET, "Prophet is not installed")
+class CachedRecommendationTest(unittest.TestCase):
+    def test_unchanged_series_is_not_refitted(self):
+        from recommender_system.resource_recommender import ResourceRecommenderProphet
+
+        with tempfile.TemporaryDirectory() as directory:
+            recommender = ResourceRecommenderProphet(ForecastCache(directory))
+            first = recommender.generate_recommendation(usage_frame(0), 'cpu')
+            with mock.patch.object(recommender, 'fit', side_effect=AssertionError("refitted")):
+                self.assertEqual(recommender.generate_recommendation(usage_frame(0), 'cpu'), first)
+            self.assertNotEqual(recommender.generate_recommendation(usage_frame(1), 'cpu'), first)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import math
+import unittest
+import numpy as np
+from metric_analyzer.health_analyzer import HealthAnalyzer, PodHealthTable, parse_health_block
+
+RESTARTS = '''NAME                          READY   STATUS             RESTARTS        AGE
+api-gateway-7d9f8c6b5-x2x4p   1/1     Running            3 (25m ago)     2d
+api-gateway-7d9f8c6b5-k9m2z   1/1     Running            0               2d
+web-5c8d7f9b4-abcde           0/1     CrashLoopBackOff   12 (3h10m ago)  5h
+orders-6b7c8d9f5-q8xz7        1/1     Running            1 (30h ago)     3d
+this line is not a pod row
+redis-0                       1/1     Running            0               45m   10.0.0.7   node-1   <none>   <none>
+'''
+
+NAMESPACED = '''NAMESPACE   NAME                     READY   STATUS    RESTARTS      AGE
+prod        web-5c8d7f9b4-xk2lp      1/1     Running   2 (90s ago)   1d
+'''
+
+class PodHealthTableTest(unittest.TestCase):
+    def setUp(self):
+        self.parsed = parse_health_block(RESTARTS)
+        self.table = self.parsed.table
+
+    def test_rows_are_typed(self):
+        frame = self.table.frame
+        self.assertEqual(list(frame['name']), [
+            'api-gateway-7d9f8c6b5-x2x4p', 'api-gateway-7d9f8c6b5-k9m2z', 'web-5c8d7f9b4-abcde',
+            'orders-6b7c8d9f5-q8xz7', 'redis-0'
+        ])
+        self.assertEqual(list(frame['restarts']), [3, 0, 12, 1, 0])
+        np.testing.assert_array_equal(frame['last_restart_age'], [1500, np.nan, 11400, 108000, np.nan])
+        np.testing.assert_array_equal(frame['age'], [172800, 172800, 18000, 259200, 2700])
+        self.assertEqual(self.parsed.line_count, 7)
+
+    def test_unparsable_lines_are_rejected_with_their_line_number(self):
+        self.assertEqual(list(self.parsed.rejects.line_numbers), [6])
+        self.assertEqual(self.parsed.rejects.lines, ['this line is not a pod row'])
+
+    def test_problematic_services(self):
+        self.assertEqual(self.table.problematic_services(), {'api-gateway', 'web', 'orders'})
+        # Within two hours only the restart 25 minutes ago counts; the crash loop last restarted 3h10m ago
+        self.assertEqual(self.table.problematic_services(window_hours=2), {'api-gateway'})
+        self.assertEqual(self.table.problematic_services(window_hours=4), {'api-gateway', 'web'})
+
+    def test_namespaced_rows(self):
+        table = parse_health_block(NAMESPACED).table
+        row = next(table.rows())
+        self.assertEqual((row.namespace, row.name, row.restarts, row.last_restart_age), ('prod', 'web-5c8d7f9b4-xk2lp', 2, 90))
+        self.assertEqual(table.problematic_services(window_hours=2), {'web'})
+
+    def test_array_round_trip_and_concat(self):
+        restored = PodHealthTable.from_arrays(self.table.to_arrays())
+        self.assertEqual(list(restored.rows()), list(self.table.rows()))
+        combined = PodHealthTable.concat([self.table, PodHealthTable.empty(), parse_health_block(NAMESPACED).table])
+        self.assertEqual(len(combined), 6)
+        self.assertEqual(combined.problematic_services(window_hours=2), {'api-gateway', 'web'})
+
+    def test_line_input_matches_block_input(self):
+        lines = HealthAnalyzer().parse_lines(RESTARTS.splitlines(keepends=True))
+        self.assertEqual(list(lines.rows()), list(self.table.rows()))
+        row = list(lines.rows())[1]
+        self.assertIsNone(row.last_restart_age)
+        self.assertFalse(math.isnan(row.age))
+
+if __name__ == '__main__':
+    unittest.main()
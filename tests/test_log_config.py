@@ -0,0 +1,26 @@
+import logging
+import multiprocessing
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from logs.log_config import init_worker_logging
+
+def log_from_worker(message: str) -> str:
+    logging.getLogger('worker').warning("%s from a worker", message)
+    return message
+
+class WorkerLoggingTest(unittest.TestCase):
+    def test_worker_records_reach_the_parent_queue(self):
+        for method in ('fork', 'spawn'):
+            with self.subTest(method=method):
+                context = multiprocessing.get_context(method)
+                log_queue = context.Queue()
+                with ProcessPoolExecutor(max_workers=1, mp_context=context,
+                                         initializer=init_worker_logging,
+                                         initargs=(log_queue, logging.INFO)) as executor:
+                    self.assertEqual(executor.submit(log_from_worker, method).result(), method)
+                record = log_queue.get(timeout=10)
+                self.assertEqual((record.name, record.levelno), ('worker', logging.WARNING))
+                self.assertEqual(record.getMessage(), f"{method} from a worker")
+
+if __name__ == '__main__':
+    unittest.main()
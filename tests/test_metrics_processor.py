@@ -0,0 +1,173 @@
+import bz2
+import gzip
+import lzma
+import os
+import tempfile
+import unittest
+from datetime import datetime
+import numpy as np
+from common.data_reader import DataReader
+from metric_analyzer.kubernetes_monitor import KubernetesMonitor
+from metric_analyzer.metrics_processor import MetricsProcessor
+from metric_analyzer.metrics_store import MetricsStore
+from common.timestamps import TimestampReconstructor
+
+DATE = '2026-10-15'
+PODS = ['api-gateway-7d9f8c6b5-x2x4p', 'api-gateway-7d9f8c6b5-k9m2z', 'web-5c8d7f9b4-abcde']
+
+def capture_lines(samples: int = 600) -> list:
+    """A capture that crosses midnight, with header rows, blank lines and unparsable lines mixed in."""
+    lines = []
+    start = 23 * 3600 + 55 * 60
+    for i in range(samples):
+        seconds = (start + i) % 86400
+        clock = f"[{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}]"
+        if i % 100 == 0:
+            lines.append(f"{clock} NAME CPU(cores) MEMORY(bytes)")
+        pod = PODS[i % len(PODS)]
+        lines.append(f"{clock} {pod} {100 + i % 37}m {200 + i % 11}Mi")
+        if i % 150 == 7:
+            lines.append("garbage line")
+            lines.append(f"{clock} {pod} lots 1Mi")
+        if i % 120 == 3:
+            lines.append("")
+    return lines
+
+def samples(store: MetricsStore) -> list:
+    names = np.asarray(store.pod_names, dtype=object)[store.pod_codes] if len(store) else []
+    return list(zip(store.timestamps.tolist(), store.cpu.tolist(), store.memory.tolist(), list(names)))
+
+class MetricsProcessorTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.dir = directory.name
+        self.text = '\n'.join(capture_lines()) + '\n'
+        self.path = self.write('metrics.txt', self.text.encode())
+
+    def write(self, name: str, data: bytes) -> str:
+        path = os.path.join(self.dir, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def parse_serial(self, path: str) -> MetricsStore:
+        return MetricsProcessor(DATE).process_blocks(DataReader(path, path).read_performance_blocks(4096), path)
+
+    def test_serial_parse(self):
+        processor = MetricsProcessor(DATE)
+        store = processor.process_blocks(DataReader(self.path, self.path).read_performance_blocks(4096))
+        self.assertEqual(len(store), 600)
+        self.assertEqual(processor.quarantine.summary(), {'malformed': 4, 'invalid_cpu': 4})
+        # The capture crosses midnight, so timestamps keep increasing into the next day
+        self.assertTrue((np.diff(store.timestamps) > 0).all())
+        self.assertEqual(str(store.datetimes()[-1])[:10], '2026-10-16')
+
+    def test_parallel_parse_matches_serial(self):
+        serial = self.parse_serial(self.path)
+        parallel = MetricsProcessor(DATE).process_file_parallel(self.path, workers=3)
+        self.assertEqual(samples(parallel), samples(serial))
+
+    def test_compressed_parse_matches_serial(self):
+        serial = samples(self.parse_serial(self.path))
+        for name, compress in (('gz', gzip.compress), ('bz2', bz2.compress), ('xz', lzma.compress)):
+            with self.subTest(compression=name):
+                path = self.write(f'metrics.txt.{name}', compress(self.text.encode()))
+                self.assertEqual(samples(self.parse_serial(path)), serial)
+
+    def test_resume_after_partial_line(self):
+        complete, partial = self.text[:-20], self.text[-20:]
+        path = self.write('growing.txt', complete.encode())
+        processor = MetricsProcessor(DATE)
+        clock = TimestampReconstructor(DATE)
+
+        first, offset = processor.process_file_from(path, 0, clock)
+        # The unterminated last line is left for the next call
+        self.assertEqual(offset, complete.rfind('\n') + 1)
+        with open(path, 'ab') as f:
+            f.write(partial.encode())
+        second, offset = processor.process_file_from(path, offset, clock)
+        self.assertEqual(offset, len(self.text))
+        self.assertEqual(samples(MetricsStore.concat([first, second])), samples(self.parse_serial(self.path)))
+
+class PodFilterTest(unittest.TestCase):
+    def test_only_pods_with_a_flagged_prefix_are_parsed(self):
+        processor = MetricsProcessor(DATE)
+        processor.set_pod_filter(['api-gateway'])
+        store = processor.process_blocks(['\n'.join(capture_lines()) + '\n'])
+        self.assertEqual(sorted(set(np.asarray(store.pod_names)[store.pod_codes])), sorted(PODS[:2]))
+        self.assertEqual(len(store), 400)
+        # Lines of other pods are skipped, not quarantined; unparsable lines still are
+        self.assertEqual(processor.quarantine.summary(), {'malformed': 4, 'invalid_cpu': 4})
+
+    def test_filter_tests_the_pod_name_of_namespaced_rows(self):
+        processor = MetricsProcessor(DATE)
+        processor.set_pod_filter(['api'])
+        store = processor.process_blocks([
+            '[10:00:00] NAMESPACE NAME CPU(cores) MEMORY(bytes)\n'
+            '[10:00:00] prod api-7d9f8c6b5-x2x4p 393m 512Mi\n'
+            '[10:00:00] api web-5c8d7f9b4-abcde 10m 20Mi\n'
+        ])
+        self.assertEqual(store.pod_names, ['prod/api-7d9f8c6b5-x2x4p'])
+        self.assertEqual(processor.quarantine.summary(), {})
+
+    def test_no_prefixes_parse_nothing(self):
+        processor = MetricsProcessor(DATE)
+        processor.set_pod_filter([])
+        self.assertEqual(len(processor.process_blocks(['\n'.join(capture_lines(50)) + '\n'])), 0)
+
+    def test_monitor_parses_only_flagged_services(self):
+        with tempfile.TemporaryDirectory() as directory:
+            metrics = os.path.join(directory, 'metrics.txt')
+            restarts = os.path.join(directory, 'restarts.txt')
+            with open(metrics, 'w') as f:
+                f.write('\n'.join(capture_lines()) + '\n')
+            open(restarts, 'w').close()
+            monitor = KubernetesMonitor(metrics, restarts, cache_dir=None)
+            store = monitor._load_metrics({'web'})
+            self.assertEqual(store.pod_names, [PODS[2]])
+            self.assertEqual(len(monitor._load_metrics(set())), 0)
+
+class FollowCheckpointTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.dir = directory.name
+        self.text = '\n'.join(capture_lines()) + '\n'
+        self.path = os.path.join(self.dir, 'metrics.txt')
+        self.restarts = os.path.join(self.dir, 'restarts.txt')
+        open(self.restarts, 'w').close()
+
+    def write(self, text: str, mode: str = 'w'):
+        with open(self.path, mode) as f:
+            f.write(text)
+        # A fixed modification time keeps the capture date the same from run to run
+        modified = datetime(2026, 10, 16, 12, 0).timestamp()
+        os.utime(self.path, (modified, modified))
+
+    def follow(self) -> MetricsStore:
+        monitor = KubernetesMonitor(self.path, self.restarts, cache_dir=os.path.join(self.dir, 'cache'), follow=True)
+        return monitor._load_metrics(set())
+
+    def test_resume_from_checkpoint_after_partial_line(self):
+        cut = len(self.text) // 2 + 5  # in the middle of a line
+        self.write(self.text[:cut])
+        first = self.follow()
+        self.write(self.text[cut:], 'a')
+        resumed = self.follow()
+
+        full = MetricsProcessor(DATE).process_blocks([self.text])
+        self.assertLess(len(first), len(full))
+        self.assertEqual(samples(resumed), samples(full))
+
+    def test_rewritten_file_is_parsed_again(self):
+        self.write(self.text)
+        self.follow()
+        # The rewritten capture starts after midnight, so its date is that of the modification time
+        tail = self.text[self.text.index('[00:00:00]'):]
+        self.write(tail)
+        rewritten = self.follow()
+        self.assertEqual(samples(rewritten), samples(MetricsProcessor('2026-10-16').process_blocks([tail])))
+
+if __name__ == '__main__':
+    unittest.main()
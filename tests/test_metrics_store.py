@@ -0,0 +1,45 @@
+import unittest
+import numpy as np
+from metric_analyzer.metrics_store import MetricsStore
+
+def service(pod_name: str) -> str:
+    return pod_name.rsplit('-', 1)[0]
+
+class GroupIndexTest(unittest.TestCase):
+    def setUp(self):
+        # web-1/web-2 belong to "web", web-api-1 to "web-api"; db-1 has no samples
+        names = ['web-1', 'web-api-1', 'web-2', 'db-1']
+        codes = np.array([0, 1, 2, 0, 1, 2, 0], dtype=np.int32)
+        self.store = MetricsStore(np.arange(7) * 10, np.arange(7) * 100.0, np.arange(7) * 1000.0, codes, names)
+        self.index = self.store.group_by_pod_key(service)
+
+    def test_groups_are_exact_keys(self):
+        self.assertEqual(sorted(self.index.keys()), ['web', 'web-api'])
+        self.assertEqual(len(self.index), 2)
+        self.assertIn('web-api', self.index)
+        self.assertNotIn('db', self.index)
+
+    def test_indices_keep_time_order(self):
+        np.testing.assert_array_equal(self.index.indices('web'), [0, 2, 3, 5, 6])
+        np.testing.assert_array_equal(self.index.indices('web-api'), [1, 4])
+        web = self.store.take(self.index.indices('web'))
+        np.testing.assert_array_equal(web.cpu, [0, 200, 300, 500, 600])
+        self.assertTrue((np.diff(web.timestamps) > 0).all())
+
+    def test_unknown_group_is_empty(self):
+        self.assertEqual(len(self.store.take(self.index.indices('orders'))), 0)
+
+    def test_empty_store(self):
+        index = MetricsStore.empty().group_by_pod_key(service)
+        self.assertEqual(len(index), 0)
+        self.assertEqual(len(index.indices('web')), 0)
+
+    def test_concat_merges_name_dictionaries(self):
+        first = MetricsStore([1], [1.0], [1.0], [0], ['web-1'])
+        second = MetricsStore([2, 3], [2.0, 3.0], [2.0, 3.0], [0, 1], ['db-1', 'web-1'])
+        store = MetricsStore.concat([first, second])
+        self.assertEqual(list(np.asarray(store.pod_names)[store.pod_codes]), ['web-1', 'db-1', 'web-1'])
+        np.testing.assert_array_equal(store.take(store.group_by_pod_key(service).indices('web')).cpu, [1.0, 3.0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from metric_analyzer.metrics_processor import MetricsProcessor
+from metric_analyzer.parse_cache import ParsedDataCache
+
+CAPTURE = ''.join(f'[10:00:{s:02d}] web-5c8d7f9b4-abcde {100 + s}m 200Mi\n' for s in range(30))
+
+class ParsedDataCacheTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.dir = directory.name
+        self.path = os.path.join(directory.name, 'metrics.txt')
+        self.write(CAPTURE, 1_000_000_000)
+        self.cache = ParsedDataCache(os.path.join(directory.name, 'cache'))
+        self.store = MetricsProcessor('2026-10-15').process_blocks([CAPTURE])
+        self.cache.save_metrics(self.path, self.store, self.cache.signature(self.path), '2026-10-15')
+
+    def write(self, text: str, mtime_ns: int):
+        with open(self.path, 'w') as f:
+            f.write(text)
+        os.utime(self.path, ns=(mtime_ns, mtime_ns))
+
+    def test_unchanged_file_is_a_hit(self):
+        cached = self.cache.load_metrics(self.path, '2026-10-15')
+        np.testing.assert_array_equal(cached.timestamps, self.store.timestamps)
+        np.testing.assert_array_equal(cached.cpu, self.store.cpu)
+        self.assertEqual(cached.pod_names, self.store.pod_names)
+
+    def test_touched_but_unchanged_file_is_still_a_hit(self):
+        self.write(CAPTURE, 2_000_000_000)
+        self.assertIsNotNone(self.cache.load_metrics(self.path, '2026-10-15'))
+
+    def test_changed_contents_invalidate_the_entry(self):
+        # Same size, new mtime, different bytes
+        self.write(CAPTURE.replace('100m', '900m'), 2_000_000_000)
+        self.assertIsNone(self.cache.load_metrics(self.path, '2026-10-15'))
+
+    def test_appended_file_invalidates_the_entry(self):
+        self.write(CAPTURE + '[10:01:00] web-5c8d7f9b4-abcde 1m 1Mi\n', 1_000_000_000)
+        self.assertIsNone(self.cache.load_metrics(self.path, '2026-10-15'))
+
+    def test_other_parse_settings_miss(self):
+        self.assertIsNone(self.cache.load_metrics(self.path, '2026-10-16'))
+
+    def test_file_changed_while_parsing_is_not_cached(self):
+        cache = ParsedDataCache(os.path.join(self.dir, 'other-cache'))
+        signature = cache.signature(self.path)
+        self.write(CAPTURE * 2, 3_000_000_000)
+        cache.save_metrics(self.path, self.store, signature, '2026-10-15')
+        self.assertIsNone(cache.load_metrics(self.path, '2026-10-15'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import json
+import os
+import tempfile
+import unittest
+import numpy as np
+from recommender_system.quantile_sketch import QuantileSketch, SketchHistory, SketchSet, RELATIVE_ACCURACY
+
+QUANTILES = [0.0, 0.01, 0.25, 0.5, 0.9, 0.95, 0.99, 1.0]
+
+def usage(size: int, seed: int = 0) -> np.ndarray:
+    """Skewed cpu-like samples with some idle (zero) values."""
+    values = np.random.default_rng(seed).lognormal(np.log(300), 0.6, size)
+    values[::50] = 0.0
+    return values
+
+class QuantileSketchTest(unittest.TestCase):
+    def assertSameSketch(self, sketch: QuantileSketch, other: QuantileSketch):
+        self.assertEqual((sketch.count, sketch.zero_count, sketch.min, sketch.max),
+                         (other.count, other.zero_count, other.min, other.max))
+        self.assertAlmostEqual(sketch.sum, other.sum, delta=1e-9 * abs(other.sum))
+        np.testing.assert_array_equal(sketch.quantiles(QUANTILES), other.quantiles(QUANTILES))
+
+    def test_quantiles_are_within_relative_accuracy(self):
+        values = usage(50000)
+        sketch = QuantileSketch()
+        sketch.update(values)
+        exact = np.quantile(values, QUANTILES, method='lower')
+        np.testing.assert_allclose(sketch.quantiles(QUANTILES), exact, rtol=RELATIVE_ACCURACY, atol=0)
+        self.assertAlmostEqual(sketch.mean, values.mean())
+
+    def test_add_matches_update(self):
+        values = usage(2000)
+        added, updated = QuantileSketch(), QuantileSketch()
+        for value in values:
+            added.add(value)
+        updated.update(np.append(values, np.nan))
+        self.assertSameSketch(added, updated)
+
+    def test_merge_matches_one_sketch_of_all_samples(self):
+        values = usage(30000)
+        whole = QuantileSketch()
+        whole.update(values)
+        merged = QuantileSketch()
+        for part in np.array_split(values, 7):
+            sketch = QuantileSketch()
+            sketch.update(part)
+            merged.merge(sketch)
+        merged.merge(QuantileSketch())
+        self.assertSameSketch(merged, whole)
+
+    def test_merge_needs_the_same_accuracy(self):
+        sketch = QuantileSketch(0.01)
+        sketch.add(1.0)
+        with self.assertRaises(ValueError):
+            QuantileSketch(0.02).merge(sketch)
+
+    def test_serialization_round_trip(self):
+        sketch = QuantileSketch()
+        sketch.update(usage(5000))
+        restored = QuantileSketch.from_dict(json.loads(json.dumps(sketch.to_dict())))
+        self.assertSameSketch(restored, sketch)
+        empty = QuantileSketch.from_dict(json.loads(json.dumps(QuantileSketch().to_dict())))
+        self.assertEqual(empty.count, 0)
+        self.assertTrue(np.isnan(empty.quantile(0.5)))
+
+    def test_collapsed_sketch_keeps_high_quantiles(self):
+        values = np.geomspace(1e-3, 1e9, 20000)
+        sketch = QuantileSketch(max_buckets=256)
+        sketch.update(values)
+        self.assertLessEqual(len(sketch.counts), 256)
+        np.testing.assert_allclose(sketch.quantiles([0.9, 0.99]), np.quantile(values, [0.9, 0.99], method='lower'),
+                                   rtol=RELATIVE_ACCURACY)
+
+class SketchSetTest(unittest.TestCase):
+    def sketch_set(self, seed: int) -> SketchSet:
+        cpu, memory = usage(3000, seed), usage(3000, seed + 1) * 2**20
+        pod_codes = np.arange(3000, dtype=np.int32) % 3
+        pod_names = ['api-gateway-7d9f8c6b5-x2x4p', 'api-gateway-7d9f8c6b5-k9m2z', 'web-5c8d7f9b4-abcde']
+        return SketchSet.from_columns(cpu, memory, pod_codes, pod_names, lambda name: name.rsplit('-', 2)[0])
+
+    def test_sketches_per_service_and_resource(self):
+        sketches = self.sketch_set(0)
+        self.assertEqual(list(sketches.services()), ['api-gateway', 'web'])
+        self.assertEqual(sketches.get('api-gateway', 'cpu').count, 2000)
+        self.assertEqual(sketches.sample_count('memory'), 3000)
+        self.assertIsNone(sketches.get('orders', 'cpu'))
+
+    def test_round_trip_and_history(self):
+        first, second = self.sketch_set(0), self.sketch_set(10)
+        restored = SketchSet.from_dict(json.loads(json.dumps(first.to_dict())))
+        for key, sketch in first.sketches.items():
+            np.testing.assert_array_equal(restored.sketches[key].quantiles(QUANTILES), sketch.quantiles(QUANTILES))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'sketches.json')
+            SketchHistory(path).record('day1', first)
+            history = SketchHistory(path)
+            history.record('day2', second)
+            history.record('day2', second)  # recording a source again replaces it
+            merged = SketchHistory(path).merged()
+
+        expected = SketchSet()
+        expected.merge(first)
+        expected.merge(second)
+        self.assertEqual(merged.sample_count(), 6000)
+        for key, sketch in expected.sketches.items():
+            np.testing.assert_array_equal(merged.sketches[key].quantiles(QUANTILES), sketch.quantiles(QUANTILES))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import math
+import unittest
+import numpy as np
+from common.quantity import cpu_millicores, memory_bytes, parse_cpu_millicores, parse_memory_bytes, parse_quantity
+
+class QuantityTest(unittest.TestCase):
+    def test_cpu_quantities(self):
+        cases = {'393m': 393, '2': 2000, '0.5': 500, '1500000n': 1.5, '250u': 0.25, '+1': 1000, '.5': 500}
+        for value, expected in cases.items():
+            with self.subTest(value=value):
+                self.assertAlmostEqual(parse_cpu_millicores(value), expected)
+
+    def test_memory_quantities(self):
+        cases = {
+            '512Mi': 512 * 2**20,
+            '1.5Gi': 1.5 * 2**30,
+            '128974848': 128974848,
+            '100M': 100e6,
+            '129e6': 129e6,
+            '1E': 1e18,
+            '1E3': 1000,
+            '2Ki': 2048
+        }
+        for value, expected in cases.items():
+            with self.subTest(value=value):
+                self.assertEqual(parse_memory_bytes(value), expected)
+
+    def test_invalid_quantities_are_nan(self):
+        for value in ('', 'abc', '12Q', 'Mi', '1.2.3', '5 Mi', '1e', '0x10'):
+            with self.subTest(value=value):
+                self.assertTrue(math.isnan(parse_quantity(value)))
+
+    def test_scale_is_applied_exactly(self):
+        self.assertEqual(parse_quantity('393m', 1000), 393.0)
+
+    def test_vectorized_conversions(self):
+        np.testing.assert_array_equal(cpu_millicores(['393m', None, 'bad', '393m', '1']),
+                                      [393, np.nan, np.nan, 393, 1000])
+        np.testing.assert_array_equal(memory_bytes(np.array([1.0, 2.0])), [1.0, 2.0])
+        np.testing.assert_array_equal(memory_bytes(['1Ki', '1k']), [1024, 1000])
+
+if __name__ == '__main__':
+    unittest.main()
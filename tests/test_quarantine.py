@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from metric_analyzer.kubernetes_monitor import KubernetesMonitor
+from metric_analyzer.quarantine import INVALID_CPU, MALFORMED, QuarantineSink, Rejects
+
+METRICS = '''[10:00:00] web-5c8d7f9b4-abcde 100m 200Mi
+garbage line
+[10:00:01] web-5c8d7f9b4-abcde lots 200Mi
+[10:00:02] web-5c8d7f9b4-abcde 110m 210Mi
+'''
+
+RESTARTS = '''NAME                  READY   STATUS    RESTARTS   AGE
+web-5c8d7f9b4-abcde   1/1     Running   0          2d
+not a pod row
+'''
+
+def rejects(line_numbers: list, reasons: list) -> Rejects:
+    return Rejects(np.array(line_numbers, np.int64), reasons, [f"line {n}" for n in line_numbers])
+
+class QuarantineSinkTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.dir = directory.name
+        self.path = os.path.join(self.dir, 'quarantine.tsv')
+
+    def read(self) -> list:
+        with open(self.path, encoding='utf-8') as f:
+            return f.read().splitlines()
+
+    def test_records_carry_source_line_number_and_reason(self):
+        with QuarantineSink(self.path, buffer_lines=2) as sink:
+            sink.add('metrics.txt', rejects([2, 5], [MALFORMED, INVALID_CPU]))
+            sink.add('metrics.txt', rejects([1], [MALFORMED]), first_line=101)
+            sink.add('restarts.txt', Rejects.empty())
+        self.assertEqual(self.read(), [
+            'metrics.txt\t2\tmalformed\tline 2',
+            'metrics.txt\t5\tinvalid_cpu\tline 5',
+            'metrics.txt\t101\tmalformed\tline 1'
+        ])
+        self.assertEqual(sink.summary(), {MALFORMED: 2, INVALID_CPU: 1})
+
+    def test_a_new_run_replaces_the_previous_one(self):
+        sink = QuarantineSink(self.path)
+        for _ in range(2):
+            with sink:
+                sink.add('metrics.txt', rejects([3], [MALFORMED]))
+        self.assertEqual(self.read(), ['metrics.txt\t3\tmalformed\tline 3'])
+        self.assertEqual(sink.summary(), {MALFORMED: 1})
+
+    def test_concat_orders_by_line_number(self):
+        merged = Rejects.concat([rejects([4, 9], [MALFORMED, MALFORMED]), Rejects.empty(),
+                                 rejects([1, 6], [INVALID_CPU, INVALID_CPU])])
+        self.assertEqual(merged.line_numbers.tolist(), [1, 4, 6, 9])
+        self.assertEqual(merged.reasons, [INVALID_CPU, MALFORMED, INVALID_CPU, MALFORMED])
+        self.assertEqual(merged.lines, ['line 1', 'line 4', 'line 6', 'line 9'])
+
+    def test_monitor_writes_each_run_once_and_closes_the_file(self):
+        metrics = os.path.join(self.dir, 'metrics.txt')
+        restarts = os.path.join(self.dir, 'restarts.txt')
+        for path, text in ((metrics, METRICS), (restarts, RESTARTS)):
+            with open(path, 'w') as f:
+                f.write(text)
+        monitor = KubernetesMonitor(metrics, restarts, cache_dir=None, pushdown=False, quarantine_file=self.path)
+        for _ in range(2):
+            monitor.run_analysis()
+            self.assertIsNone(monitor.quarantine.file)
+        self.assertEqual(self.read(), [
+            f'{restarts}\t3\tmalformed\tnot a pod row',
+            f'{metrics}\t2\tmalformed\tgarbage line',
+            f'{metrics}\t3\tinvalid_cpu\t[10:00:01] web-5c8d7f9b4-abcde lots 200Mi'
+        ])
+        self.assertEqual(monitor.quarantine.summary(), {MALFORMED: 2, INVALID_CPU: 1})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import numpy as np
+import pandas as pd
+from metric_analyzer.metrics_store import MetricsStore
+from metric_analyzer.resampling import Resampler, parse_aggregate, parse_bucket
+
+MINUTE = 60 * 10**9
+T0 = pd.Timestamp('2026-10-15 10:00').value
+PODS = ['web-1', 'web-2', 'web-3']
+
+def replicas(minutes: list) -> MetricsStore:
+    """Pods using 100, 200 and 300 millicores in every given minute; web-1 is scraped twice a minute."""
+    samples = []
+    for minute in minutes:
+        start = T0 + minute * MINUTE
+        samples += [(start, 100.0, 0), (start + MINUTE // 2, 100.0, 0), (start + 10**9, 200.0, 1), (start + 2 * 10**9, 300.0, 2)]
+    timestamps, cpu, codes = (np.array(column) for column in zip(*samples))
+    return MetricsStore(timestamps, cpu, cpu * 2**20, codes.astype(np.int32), PODS)
+
+class ResamplerTest(unittest.TestCase):
+    def resample(self, aggregate: str, per_pod: bool = True, minutes: list = (0, 1)) -> pd.DataFrame:
+        return Resampler('1min', aggregate, per_pod).resample(replicas(list(minutes)))
+
+    def test_sum_is_the_bucket_total_across_pods(self):
+        np.testing.assert_array_equal(self.resample('sum')['cpu'], [600, 600])
+        np.testing.assert_array_equal(self.resample('mean')['cpu'], [200, 200])
+        np.testing.assert_array_equal(self.resample('max')['cpu'], [300, 300])
+        np.testing.assert_array_equal(self.resample('sum')['memory'], [600 * 2**20, 600 * 2**20])
+
+    def test_raw_samples_without_per_pod(self):
+        # web-1's second sample in each bucket counts again
+        np.testing.assert_array_equal(self.resample('sum', per_pod=False)['cpu'], [700, 700])
+        np.testing.assert_array_equal(self.resample('mean', per_pod=False)['cpu'], [175, 175])
+
+    def test_percentile(self):
+        np.testing.assert_array_equal(self.resample('p50')['cpu'], [200, 200])
+        np.testing.assert_allclose(self.resample('p99.9')['cpu'], [299.8, 299.8])
+
+    def test_every_bucket_is_kept_and_empty_ones_are_nan(self):
+        resampled = self.resample('sum', minutes=(0, 3))
+        self.assertEqual(list(resampled.index), list(pd.date_range('2026-10-15 10:00', periods=4, freq='1min')))
+        self.assertEqual(resampled.index.name, 'timestamp')
+        np.testing.assert_array_equal(resampled['cpu'], [600, np.nan, np.nan, 600])
+
+    def test_empty_store(self):
+        self.assertTrue(Resampler().resample(MetricsStore.empty()).empty)
+
+    def test_invalid_settings_are_rejected(self):
+        self.assertEqual(parse_bucket('30s'), '30s')
+        self.assertEqual(parse_aggregate('p95'), 'p95')
+        for bucket in ('often', '0min'):
+            with self.subTest(bucket=bucket), self.assertRaises(ValueError):
+                parse_bucket(bucket)
+        for aggregate in ('median', 'p100', 'p'):
+            with self.subTest(aggregate=aggregate), self.assertRaises(ValueError):
+                parse_aggregate(aggregate)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import importlib.util
+import logging
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+HAS_PROPHET = importlib.util.find_spec('prophet') is not None
+
+def usage_frame(minutes: int, seed: int = 0) -> pd.DataFrame:
+    """Per-minute cpu samples with an hourly cycle and noise, indexed by timestamp."""
+    rng = np.random.default_rng(seed)
+    steps = np.arange(minutes)
+    cpu = 400 + 50 * np.sin(2 * np.pi * steps / 60) + rng.normal(0, 10, minutes)
+    index = pd.date_range('2026-10-15', periods=minutes, freq='1min', name='timestamp')
+    return pd.DataFrame({'cpu': cpu}, index=index)
+
+@unittest.skipUnless(HAS_PROPHET, "Prophet is not installed")
+class WarmStartTest(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+
+    def test_warm_refit_matches_cold_fit(self):
+        from recommender_system.forecast_cache import ForecastCache
+        from recommender_system.resource_recommender import ResourceRecommenderProphet
+
+        recommender = ResourceRecommenderProphet(ForecastCache(self.cache_dir.name), warm_start=True)
+        config = recommender._model_config('cpu')
+        history = usage_frame(6 * 60)
+        recommender.fit(recommender._preprocess_metrics(history.iloc[:5 * 60], 'cpu'), 'cpu', 'api')
+        self.assertIsNotNone(recommender.cache.load_params('api', config))
+
+        # The extended series is refitted from the stored parameters and cold, from scratch
+        extended = recommender._preprocess_metrics(history, 'cpu')
+        with self.assertNoLogs('recommender_system.resource_recommender', logging.INFO):
+            warm = recommender.predict(recommender.fit(extended, 'cpu', 'api'))
+        cold = recommender.predict(ResourceRecommenderProphet().fit(extended, 'cpu'))
+
+        np.testing.assert_array_equal(warm['ds'].to_numpy(), cold['ds'].to_numpy())
+        np.testing.assert_allclose(warm['yhat'], cold['yhat'], rtol=0.01)
+
+if __name__ == '__main__':
+    unittest.main()
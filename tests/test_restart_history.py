@@ -0,0 +1,50 @@
+import unittest
+from metric_analyzer.health_analyzer import parse_health_block
+from metric_analyzer.restart_history import RestartHistoryStore
+
+HEADER = 'NAME                          READY   STATUS    RESTARTS        AGE\n'
+HOUR = 3600
+T0 = 1_790_000_000
+
+def snapshot(api: str, web: str):
+    return parse_health_block(
+        HEADER
+        + f'api-gateway-7d9f8c6b5-x2x4p   1/1     Running   {api}   2d\n'
+        + f'web-5c8d7f9b4-xk2lp           1/1     Running   {web}   2d\n'
+    ).table
+
+class RestartHistoryStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.store = RestartHistoryStore(':memory:')
+        self.addCleanup(self.store.close)
+        self.store.append_snapshot(snapshot('3 (25m ago)', '0'), T0)
+        self.store.append_snapshot(snapshot('5 (5m ago)', '2 (10m ago)'), T0 + HOUR)
+        self.store.append_snapshot(snapshot('5 (65m ago)', '4 (1m ago)'), T0 + 2 * HOUR)
+
+    def test_totals_count_counter_growth_between_snapshots(self):
+        # api: one restart before its first snapshot in the window, then 3 -> 5; web: 0 -> 2 -> 4
+        totals = self.store.services_with_restarts(window_hours=24, until=T0 + 2 * HOUR)
+        self.assertEqual(totals, {'web': 4, 'api-gateway': 3})
+
+    def test_window_and_minimum(self):
+        # The last hour holds the second and third snapshots; api did not restart after the second one
+        self.assertEqual(self.store.services_with_restarts(window_hours=1, until=T0 + 2 * HOUR), {'web': 2})
+        self.assertEqual(self.store.services_with_restarts(min_restarts=4, until=T0 + 2 * HOUR), {'web': 4})
+
+    def test_recording_a_snapshot_again_does_not_double_count(self):
+        self.store.append_snapshot(snapshot('5 (5m ago)', '2 (10m ago)'), T0 + HOUR)
+        totals = self.store.services_with_restarts(window_hours=24, until=T0 + 2 * HOUR)
+        self.assertEqual(totals, {'web': 4, 'api-gateway': 3})
+
+    def test_replaced_pod_counter_does_not_go_negative(self):
+        self.store.append_snapshot(snapshot('0', '1 (1m ago)'), T0 + 3 * HOUR)
+        totals = self.store.services_with_restarts(window_hours=24, until=T0 + 3 * HOUR)
+        self.assertEqual(totals, {'api-gateway': 3, 'web': 4})
+
+    def test_trend_buckets(self):
+        trend = self.store.restart_trend('web', days=1, bucket_hours=1, until=T0 + 2 * HOUR)
+        self.assertEqual([total for _, _, total in trend], [0, 2, 2])
+        self.assertEqual([start for _, start, _ in trend], [T0, T0 + HOUR, T0 + 2 * HOUR])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+import numpy as np
+import pandas as pd
+from common.timestamps import TimestampReconstructor, seconds_of_day
+
+def at(day: str, clock: str) -> int:
+    return pd.Timestamp(f"{day} {clock}").value
+
+class SecondsOfDayTest(unittest.TestCase):
+    def test_parses_clock_times(self):
+        np.testing.assert_array_equal(seconds_of_day(['00:00:00', '10:00:05', '23:59:59', '10:00:05']),
+                                      [0, 36005, 86399, 36005])
+
+    def test_invalid_times_are_negative(self):
+        np.testing.assert_array_equal(seconds_of_day(['24:00:00', '10:60:00', '10:00', 'ab:cd:ef']), [-1] * 4)
+
+class TimestampReconstructorTest(unittest.TestCase):
+    def test_midnight_rollover_advances_the_day(self):
+        clock = TimestampReconstructor('2026-10-15')
+        converted = clock.convert(seconds_of_day(['23:59:58', '23:59:59', '00:00:00', '00:00:01']))
+        np.testing.assert_array_equal(converted, [
+            at('2026-10-15', '23:59:58'), at('2026-10-15', '23:59:59'),
+            at('2026-10-16', '00:00:00'), at('2026-10-16', '00:00:01')
+        ])
+
+    def test_small_backward_jitter_stays_on_the_same_day(self):
+        clock = TimestampReconstructor('2026-10-15')
+        converted = clock.convert(seconds_of_day(['10:00:05', '10:00:04', '10:00:06']))
+        np.testing.assert_array_equal(converted, [
+            at('2026-10-15', '10:00:05'), at('2026-10-15', '10:00:04'), at('2026-10-15', '10:00:06')
+        ])
+
+    def test_rollover_is_tracked_across_calls_and_checkpoints(self):
+        clock = TimestampReconstructor('2026-10-15')
+        clock.convert(seconds_of_day(['22:00:00', '23:59:59']))
+        resumed = TimestampReconstructor.from_state(clock.state())
+        for reconstructor in (clock, resumed):
+            np.testing.assert_array_equal(reconstructor.convert(seconds_of_day(['00:00:10'])),
+                                          [at('2026-10-16', '00:00:10')])
+
+    def test_several_days(self):
+        clock = TimestampReconstructor('2026-10-15')
+        converted = clock.convert(seconds_of_day(['12:00:00', '23:00:00', '06:00:00', '23:00:00', '06:00:00']))
+        self.assertEqual(pd.Timestamp(converted[-1]), pd.Timestamp('2026-10-17 06:00:00'))
+        self.assertEqual(clock.day_offset, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+from metric_analyzer.workload_resolver import Workload, resolve_workload, workload_name
+
+class WorkloadResolverTest(unittest.TestCase):
+    def test_naming_schemes(self):
+        cases = {
+            'api-gateway-7d9f8c6b5-x2x4p': Workload('api-gateway', 'deployment'),
+            'web-5c8d7f9b4-abcde': Workload('web', 'deployment'),
+            'payments-v2-7c9d8f6b5d-q8xz7': Workload('payments-v2', 'deployment'),
+            'legacy-0a1b2c3d4e-xk2lp': Workload('legacy', 'deployment'),
+            'billing-cron-28312345-bdfgh': Workload('billing-cron', 'cronjob'),
+            'redis-0': Workload('redis', 'statefulset'),
+            'kafka-broker-12': Workload('kafka-broker', 'statefulset'),
+            'node-exporter-x7k2p': Workload('node-exporter', 'daemonset_or_job'),
+            'migrate-db-4wz9c': Workload('migrate-db', 'daemonset_or_job')
+        }
+        for pod_name, expected in cases.items():
+            with self.subTest(pod_name=pod_name):
+                self.assertEqual(resolve_workload(pod_name), expected)
+
+    def test_ordinary_words_are_not_stripped(self):
+        # A trailing word with vowels is not a generated suffix, and a word is not a replicaset hash
+        for pod_name in ('api-proxy', 'web-frontend', 'my-service-abcde', 'static'):
+            with self.subTest(pod_name=pod_name):
+                self.assertEqual(resolve_workload(pod_name), Workload(pod_name, 'pod'))
+
+    def test_namespace_is_stripped(self):
+        self.assertEqual(workload_name('prod/web-5c8d7f9b4-abcde'), 'web')
+        self.assertEqual(workload_name('web-5c8d7f9b4-abcde'), 'web')
+
+if __name__ == '__main__':
+    unittest.main()